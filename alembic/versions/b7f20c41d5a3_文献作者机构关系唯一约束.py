@@ -0,0 +1,36 @@
+"""文献作者机构关系唯一约束
+
+Revision ID: b7f20c41d5a3
+Revises: 3ccb3ece839c
+Create Date: 2025-08-28 10:12:44.318225
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7f20c41d5a3'
+down_revision: Union[str, Sequence[str], None] = '3ccb3ece839c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_unique_constraint(
+        'uq_article_author_affiliation',
+        'article_author_affiliations',
+        ['article_doi', 'author_id', 'affiliation_id']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint(
+        'uq_article_author_affiliation',
+        'article_author_affiliations',
+        type_='unique'
+    )
@@ -1,8 +1,40 @@
 import re
+from functools import lru_cache
 from typing import Optional, Tuple, List
 from difflib import SequenceMatcher
 import unicodedata
 
+try:
+    # RapidFuzz 是 C++ 实现的模糊匹配库，比 difflib 快一个数量级
+    from rapidfuzz import fuzz as _rf_fuzz
+    from rapidfuzz import process as _rf_process
+    HAS_RAPIDFUZZ = True
+except ImportError:
+    HAS_RAPIDFUZZ = False
+
+
+# 预编译正则表达式（避免每次调用时重新编译）
+_EMAIL_RE = re.compile(r'\S+@\S+')
+_POSTAL_NUM_RE = re.compile(r'\b\d{5,6}\b')
+_POSTAL_UK_RE = re.compile(r'\b[A-Z]{1,2}\d{1,2}[A-Z]?\s*\d[A-Z]{2}\b', re.IGNORECASE)
+_NONWORD_RE = re.compile(r'[^\w\s,.\'-]')
+_DOT_SPACE_RE = re.compile(r'\.(?=[a-z])')
+
+# 组件提取用的合并正则：一次扫描同时找出邮政编码和电子邮件域名
+_COMPONENTS_RE = re.compile(
+    r'(?P<postal>\b\d{5,6}\b|\b[A-Z]{1,2}\d{1,2}[A-Z]?\s*\d[A-Z]{2}\b)'
+    r'|@(?P<email_host>[A-Za-z0-9.-]+\.[A-Za-z]{2,})'
+)
+
+# 引号/破折号的逐字符映射表（str.translate 单趟 C 级替换，无需正则）
+_PUNCT_TRANS = str.maketrans({
+    '“': "'", '”': "'",  # 弯双引号
+    '‘': "'", '’': "'",  # 弯单引号
+    '`': "'", '´': "'",       # 重音引号
+    '"': "'",
+    '—': '-', '–': '-'   # 长短破折号
+})
+
 
 class AffiliationNormalizer:
     """机构名称标准化工具类"""
@@ -37,8 +69,22 @@ class AffiliationNormalizer:
         'mech': 'mechanical'
     }
     
+    # 机构缩写的合并正则（按长度降序排列，确保 univ 优先于 u 匹配；
+    # 可选的尾部点对应 "univ." 这类写法）
+    _ABBR_RE = re.compile(
+        r'\b(' + '|'.join(
+            re.escape(abbr) for abbr in sorted(INSTITUTION_ABBREVIATIONS, key=len, reverse=True)
+        ) + r')\.?(?![\w.])'
+    )
+
     # 需要保留的介词和连词
-    KEEP_WORDS = {'of', 'and', 'for', 'the', 'in', 'at', 'on'}
+    KEEP_WORDS = frozenset({'of', 'and', 'for', 'the', 'in', 'at', 'on'})
+
+    # 标识部门/科室的关键词（用于组件提取）
+    _DEPT_KEYWORDS = frozenset({
+        'department', 'dept', 'division', 'div',
+        'laboratory', 'lab', 'center', 'institute'
+    })
     
     # 国家和地区的标准化映射
     COUNTRY_MAPPING = {
@@ -58,6 +104,28 @@ class AffiliationNormalizer:
         'republic of korea': 'south korea',
         'rok': 'south korea'
     }
+
+    # 融合的清理正则：一次扫描同时处理电子邮件、邮政编码、
+    # 国家名称和机构缩写，替代逐项的多趟全串扫描
+    _FUSED_RE = re.compile(
+        r'(?P<email>\S+@\S+)'
+        r'|\b(?P<postal>\d{5,6}|[A-Z]{1,2}\d{1,2}[A-Z]?\s*\d[A-Z]{2})\b'
+        r'|\b(?P<country>' + '|'.join(
+            re.escape(abbr) for abbr in sorted(COUNTRY_MAPPING, key=len, reverse=True)
+        ) + r')\b'
+        r'|\b(?P<abbr>' + '|'.join(
+            re.escape(abbr) for abbr in sorted(INSTITUTION_ABBREVIATIONS, key=len, reverse=True)
+        ) + r')\.?(?![\w.])',
+        re.IGNORECASE
+    )
+
+    # 国家名称的合并正则（按长度降序排列，确保长缩写优先匹配）
+    _COUNTRY_RE = re.compile(
+        r'\b(' + '|'.join(
+            re.escape(abbr) for abbr in sorted(COUNTRY_MAPPING, key=len, reverse=True)
+        ) + r')\b',
+        re.IGNORECASE
+    )
     
     @classmethod
     def normalize(cls, affiliation_text: str) -> str:
@@ -72,35 +140,43 @@ class AffiliationNormalizer:
         """
         if not affiliation_text:
             return ""
-        
-        # 转换为小写
+        return cls._normalize_cached(affiliation_text)
+
+    @classmethod
+    @lru_cache(maxsize=50000)
+    def _normalize_cached(cls, affiliation_text: str) -> str:
+        """标准化的实际实现，按输入字符串缓存结果
+
+        同一机构会出现在成千上万条记录中，缓存可以让重复字符串
+        跳过整条正则/Unicode 处理流水线。
+        """
+        # 转换为小写（空白折叠只在结尾做一次，中间各步对多余空格不敏感）
         text = affiliation_text.lower()
-        
-        # 移除多余的空白字符
-        text = ' '.join(text.split())
-        
+
         # 移除 Unicode 特殊字符
         text = cls._remove_accents(text)
-        
+
         # 标准化标点符号
         text = cls._normalize_punctuation(text)
-        
-        # 展开缩写
-        text = cls._expand_abbreviations(text)
-        
-        # 标准化国家名称
-        text = cls._normalize_country_names(text)
-        
-        # 移除邮政编码
-        text = cls._remove_postal_codes(text)
-        
-        # 移除电子邮件
-        text = re.sub(r'\S+@\S+', '', text)
-        
+
+        # 一次扫描完成：移除电子邮件和邮政编码、标准化国家名称、展开缩写
+        text = cls._FUSED_RE.sub(cls._fused_replacement, text)
+
         # 再次清理多余空格
         text = ' '.join(text.split())
-        
+
         return text.strip()
+
+    @classmethod
+    def _fused_replacement(cls, match: re.Match) -> str:
+        """融合清理正则的替换回调"""
+        group = match.lastgroup
+        if group == 'abbr':
+            return cls.INSTITUTION_ABBREVIATIONS[match.group('abbr')]
+        if group == 'country':
+            return cls.COUNTRY_MAPPING[match.group('country').lower()]
+        # 电子邮件和邮政编码直接删除
+        return ''
     
     @classmethod
     def extract_components(cls, affiliation_text: str) -> dict:
@@ -113,6 +189,13 @@ class AffiliationNormalizer:
         Returns:
             包含部门、机构、城市、国家等信息的字典
         """
+        # 返回副本，避免调用方修改缓存的字典
+        return dict(cls._extract_components_cached(affiliation_text))
+
+    @classmethod
+    @lru_cache(maxsize=50000)
+    def _extract_components_cached(cls, affiliation_text: str) -> dict:
+        """组件提取的实际实现，按输入字符串缓存结果"""
         components = {
             'department': None,
             'institution': None,
@@ -122,22 +205,30 @@ class AffiliationNormalizer:
             'postal_code': None
         }
         
-        # 提取邮政编码
-        postal_match = re.search(r'\b\d{5,6}\b|\b[A-Z]{1,2}\d{1,2}[A-Z]?\s*\d[A-Z]{2}\b', affiliation_text)
-        if postal_match:
-            components['postal_code'] = postal_match.group()
-        
-        # 提取电子邮件域名作为机构线索
-        email_match = re.search(r'@([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})', affiliation_text)
-        if email_match:
-            components['email_domain'] = email_match.group(1)
+        # 一次扫描同时提取邮政编码和电子邮件域名（作为机构线索）
+        for match in _COMPONENTS_RE.finditer(affiliation_text):
+            if match.lastgroup == 'postal':
+                if components['postal_code'] is None:
+                    components['postal_code'] = match.group('postal')
+            elif 'email_domain' not in components:
+                components['email_domain'] = match.group('email_host')
         
         # 分割成部分（通常用逗号分隔）
         parts = [p.strip() for p in affiliation_text.split(',')]
         
         if parts:
-            # 第一部分通常是部门
-            if any(keyword in parts[0].lower() for keyword in ['department', 'dept', 'division', 'div', 'laboratory', 'lab', 'center', 'institute']):
+            # 第一部分通常是部门：词缘标点先剥掉（"Dept." 才能命中），
+            # 交集是单数词形的快路径，前缀匹配兜住
+            # "Departments"/"Laboratories" 这类复数形式
+            first_tokens = {
+                token.strip('.,;:()') for token in parts[0].lower().split()
+            }
+            is_department = bool(cls._DEPT_KEYWORDS & first_tokens) or any(
+                token.startswith(keyword)
+                for token in first_tokens
+                for keyword in cls._DEPT_KEYWORDS
+            )
+            if is_department:
                 components['department'] = parts[0]
                 if len(parts) > 1:
                     components['institution'] = parts[1]
@@ -155,14 +246,21 @@ class AffiliationNormalizer:
         return components
     
     @classmethod
-    def calculate_similarity(cls, affiliation1: str, affiliation2: str) -> float:
+    def calculate_similarity(
+        cls,
+        affiliation1: str,
+        affiliation2: str,
+        _matcher: Optional[SequenceMatcher] = None
+    ) -> float:
         """
         计算两个机构名称的相似度
-        
+
         Args:
             affiliation1: 第一个机构名称
             affiliation2: 第二个机构名称
-        
+            _matcher: 可选的预构建 SequenceMatcher，seq2 必须已设置为
+                affiliation1 的标准化结果（供 find_best_match 复用索引）
+
         Returns:
             相似度分数 (0-1)
         """
@@ -184,18 +282,33 @@ class AffiliationNormalizer:
             comp1['country'] == comp2['country']):
             return 0.9
         
-        # 计算基本的字符串相似度
-        base_similarity = cls._string_similarity(norm1, norm2)
-        
-        # 如果包含相同的关键词（如大学名），提高相似度
+        # 廉价预筛：长度差距过大的字符串不可能达到匹配阈值，
+        # 直接返回，避免昂贵的逐字符比较
+        len1, len2 = len(norm1), len(norm2)
+        if not len1 or not len2 or min(len1, len2) / max(len1, len2) < 0.5:
+            return 0.0
+
         keywords1 = set(norm1.split())
         keywords2 = set(norm2.split())
-        
-        # 找出重要的共同关键词
+
+        # 词集合 Jaccard 下界：几乎没有共同词的直接用它作为分数返回
+        union = keywords1 | keywords2
+        jaccard = len(keywords1 & keywords2) / len(union) if union else 0.0
+        if jaccard < 0.2:
+            return jaccard
+
+        # 计算基本的字符串相似度（有预构建 matcher 时复用 seq2 侧索引）
+        if _matcher is not None:
+            _matcher.set_seq1(norm2)
+            base_similarity = _matcher.ratio()
+        else:
+            base_similarity = cls._string_similarity(norm1, norm2)
+
+        # 找出重要的共同关键词（如大学名），提高相似度
         important_common = keywords1 & keywords2 - cls.KEEP_WORDS
         if len(important_common) >= 2:
             base_similarity = min(1.0, base_similarity + 0.2)
-        
+
         return base_similarity
     
     @classmethod
@@ -217,64 +330,66 @@ class AffiliationNormalizer:
     @staticmethod
     def _remove_accents(text: str) -> str:
         """移除重音符号"""
+        # ASCII 字符串没有重音符号，直接返回（绝大多数机构文本走这条快路径）
+        if text.isascii():
+            return text
+
+        nfd = unicodedata.normalize('NFD', text)
+        # NFD 分解后组合符号都在 U+0300 及以上；max() 在 C 层按码点
+        # 比较一趟扫完，代替逐字符的 Python 级 ord() 循环
+        if max(nfd) < '\u0300':
+            return nfd
+
         return ''.join(
-            c for c in unicodedata.normalize('NFD', text)
+            c for c in nfd
             if unicodedata.category(c) != 'Mn'
         )
     
     @staticmethod
     def _normalize_punctuation(text: str) -> str:
         """标准化标点符号"""
-        # 统一引号
-        text = re.sub(r'[""''`´]', "'", text)
-        # 统一破折号
-        text = re.sub(r'[—–]', '-', text)
+        # 统一引号和破折号（单趟字符映射）
+        text = text.translate(_PUNCT_TRANS)
         # 移除多余的标点
-        text = re.sub(r'[^\w\s,.\'-]', ' ', text)
+        text = _NONWORD_RE.sub(' ', text)
         # 标准化缩写的点
-        text = re.sub(r'\.(?=[a-z])', '. ', text)
+        text = _DOT_SPACE_RE.sub('. ', text)
         return text
     
     @classmethod
     def _expand_abbreviations(cls, text: str) -> str:
         """展开常见缩写"""
-        words = text.split()
-        expanded_words = []
-        
-        for word in words:
-            # 移除尾部的点
-            clean_word = word.rstrip('.')
-            
-            # 如果是已知的缩写，展开它
-            if clean_word in cls.INSTITUTION_ABBREVIATIONS:
-                expanded_words.append(cls.INSTITUTION_ABBREVIATIONS[clean_word])
-            else:
-                expanded_words.append(word)
-        
-        return ' '.join(expanded_words)
+        # 一次正则扫描替代逐词分割、查字典的 Python 循环
+        return cls._ABBR_RE.sub(
+            lambda m: cls.INSTITUTION_ABBREVIATIONS[m.group(1)],
+            text
+        )
     
     @classmethod
     def _normalize_country_names(cls, text: str) -> str:
         """标准化国家名称"""
-        for abbr, full_name in cls.COUNTRY_MAPPING.items():
-            # 使用单词边界确保完整匹配
-            pattern = r'\b' + re.escape(abbr) + r'\b'
-            text = re.sub(pattern, full_name, text, flags=re.IGNORECASE)
-        return text
+        # 一次扫描替换所有国家缩写，替代逐个缩写的多次扫描
+        return cls._COUNTRY_RE.sub(
+            lambda m: cls.COUNTRY_MAPPING[m.group(1).lower()],
+            text
+        )
     
     @staticmethod
     def _remove_postal_codes(text: str) -> str:
         """移除邮政编码"""
         # 移除5-6位数字（美国、中国等邮编）
-        text = re.sub(r'\b\d{5,6}\b', '', text)
+        text = _POSTAL_NUM_RE.sub('', text)
         # 移除英国邮编格式
-        text = re.sub(r'\b[A-Z]{1,2}\d{1,2}[A-Z]?\s*\d[A-Z]{2}\b', '', text, flags=re.IGNORECASE)
+        text = _POSTAL_UK_RE.sub('', text)
         return text
     
     @staticmethod
     def _string_similarity(str1: str, str2: str) -> float:
         """计算两个字符串的相似度"""
-        return SequenceMatcher(None, str1, str2).ratio()
+        if HAS_RAPIDFUZZ:
+            return _rf_fuzz.token_set_ratio(str1, str2) / 100.0
+        # autojunk 的启发式会静默降低长字符串的匹配质量，关闭它
+        return SequenceMatcher(None, str1, str2, autojunk=False).ratio()
     
     @classmethod
     def find_best_match(cls, affiliation: str, candidates: List[Tuple[int, str]], threshold: float = 0.85) -> Optional[int]:
@@ -289,13 +404,82 @@ class AffiliationNormalizer:
         Returns:
             最佳匹配的机构ID，如果没有找到则返回 None
         """
+        if not candidates:
+            return None
+
+        if HAS_RAPIDFUZZ:
+            # 预先标准化一次，然后用 C 扩展批量匹配（带分数截断提前退出）
+            normalized_query = cls.normalize(affiliation)
+            choices = {cid: cls.normalize(name) for cid, name in candidates}
+            match = _rf_process.extractOne(
+                normalized_query,
+                choices,
+                scorer=_rf_fuzz.token_set_ratio,
+                score_cutoff=threshold * 100
+            )
+            return match[2] if match else None
+
+        # difflib 回退路径：把查询串固定在 seq2 侧，
+        # 复用其 b2j 索引，逐个候选只需重建 seq1
+        matcher = SequenceMatcher(None, autojunk=False)
+        matcher.set_seq2(cls.normalize(affiliation))
+
         best_match_id = None
         best_similarity = 0.0
-        
+
         for candidate_id, candidate_name in candidates:
-            similarity = cls.calculate_similarity(affiliation, candidate_name)
+            similarity = cls.calculate_similarity(affiliation, candidate_name, _matcher=matcher)
             if similarity > best_similarity and similarity >= threshold:
                 best_similarity = similarity
                 best_match_id = candidate_id
-        
-        return best_match_id
\ No newline at end of file
+
+        return best_match_id
+
+    @classmethod
+    def find_best_matches_batch(
+        cls,
+        queries: List[str],
+        candidates: List[Tuple[int, str]],
+        threshold: float = 0.85
+    ) -> List[Optional[int]]:
+        """
+        批量查找多个机构名称的最佳匹配
+
+        对 N 个查询 × M 个候选的去重场景，用 rapidfuzz 的 cdist 在
+        C 层一次性计算相似度矩阵，避免 N·M 次 Python 级比较。
+
+        Args:
+            queries: 要匹配的机构名称列表
+            candidates: 候选机构列表，格式为 [(id, name), ...]
+            threshold: 匹配阈值
+
+        Returns:
+            与 queries 对齐的机构 ID 列表，未匹配的位置为 None
+        """
+        if not queries or not candidates:
+            return [None] * len(queries)
+
+        if HAS_RAPIDFUZZ:
+            candidate_ids = [cid for cid, _ in candidates]
+            names = [cls.normalize(name) for _, name in candidates]
+            normalized_queries = [cls.normalize(q) for q in queries]
+
+            # workers=-1 使用 C 线程池并行计算，绕开 GIL
+            scores = _rf_process.cdist(
+                normalized_queries,
+                names,
+                scorer=_rf_fuzz.token_set_ratio,
+                score_cutoff=threshold * 100,
+                workers=-1
+            )
+
+            results: List[Optional[int]] = []
+            for row in scores:
+                best_index = int(row.argmax())
+                if row[best_index] >= threshold * 100:
+                    results.append(candidate_ids[best_index])
+                else:
+                    results.append(None)
+            return results
+
+        return [cls.find_best_match(q, candidates, threshold) for q in queries]
\ No newline at end of file
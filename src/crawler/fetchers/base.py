@@ -1,32 +1,77 @@
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional
+import asyncio
 import logging
 
 from src.db.session import get_db
 from src.crawler.utils import EntrezClient, HTTPClient
+from src.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
 
 class BaseFetcher(ABC):
     """基础数据获取器"""
-    
+
+    # 所有获取器共享一个 HTTP 客户端，复用连接池避免重复 TLS 握手
+    _shared_client: Optional[HTTPClient] = None
+    _client_lock = asyncio.Lock()
+
     def __init__(self):
         """初始化基础获取器"""
         self.entrez_client = EntrezClient()
         self.http_client: Optional[HTTPClient] = None
         self.logger = logger
-    
+        # 限制同时在途的任务数，避免一次性挂起 O(N) 个任务
+        self._sem = asyncio.Semaphore(settings.CRAWLER_MAX_CONCURRENCY)
+        # 上下文引用计数：同一个 fetcher 实例会被多个并发协程
+        # async with 进入，资源只在 0→1 时获取、1→0 时释放，
+        # 中途退出不会把资源从其他在途协程脚下抽走
+        self._ctx_refs = 0
+        self._ctx_lock = asyncio.Lock()
+
+    async def _bounded(self, coro):
+        """在并发信号量约束下执行协程"""
+        async with self._sem:
+            return await coro
+
     async def __aenter__(self):
-        """异步上下文管理器入口"""
-        self.http_client = HTTPClient()
-        await self.http_client.__aenter__()
+        """异步上下文管理器入口（引用计数，可并发重入）"""
+        async with self._ctx_lock:
+            if self._ctx_refs == 0:
+                await self._acquire_resources()
+            self._ctx_refs += 1
         return self
-    
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """异步上下文管理器出口"""
-        if self.http_client:
-            await self.http_client.__aexit__(exc_type, exc_val, exc_tb)
+        """异步上下文管理器出口
+
+        只有最后一个使用者退出时才释放实例资源；
+        共享客户端不在这里关闭，由应用退出时调用 close_all() 统一关闭
+        """
+        async with self._ctx_lock:
+            self._ctx_refs -= 1
+            if self._ctx_refs == 0:
+                await self._release_resources()
+
+    async def _acquire_resources(self):
+        """首个上下文进入时获取实例资源（子类可扩展）"""
+        async with BaseFetcher._client_lock:
+            if BaseFetcher._shared_client is None:
+                BaseFetcher._shared_client = HTTPClient()
+        self.http_client = BaseFetcher._shared_client
+
+    async def _release_resources(self):
+        """最后一个上下文退出时释放实例资源（子类可扩展）"""
+        self.http_client = None
+
+    @classmethod
+    async def close_all(cls):
+        """关闭共享的 HTTP 客户端（应用退出时调用）"""
+        async with BaseFetcher._client_lock:
+            if BaseFetcher._shared_client is not None:
+                await BaseFetcher._shared_client.close()
+                BaseFetcher._shared_client = None
     
     @abstractmethod
     async def fetch(self, *args, **kwargs) -> Any:
@@ -1,26 +1,105 @@
 from typing import List, Dict, Any, Optional
 import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
+from functools import partial
 
 from .base import BaseFetcher
+from src.config.settings import settings
 from src.crawler.utils import retry_with_backoff, extract_doi, clean_text, parse_date, safe_get, safe_get_value
 
+@dataclass(slots=True)
+class ArticleRecord:
+    """
+    解析后的单篇文献记录
+
+    slots 数据类比字符串键字典省内存（无每实例哈希表），属性访问
+    也更快。提供 get/下标/in 访问以兼容现有按字典消费的代码。
+    """
+    pmid: str
+    doi: Optional[str]
+    title: str
+    abstract: Optional[str]
+    journal: Dict[str, Any]
+    authors: List[Dict[str, Any]]
+    keywords: List[Dict[str, str]]
+    mesh_terms: List[Dict[str, Any]]
+    chemicals: List[Dict[str, str]]
+    publication_types: List[str]
+    grants: List[Dict[str, str]]
+    other_ids: Dict[str, str]
+    dates: Dict[str, Any]
+    pagination: str
+    language: str
+    copyright_info: Optional[str]
+    coi_statement: Optional[str]
+    raw_data: Optional[Any] = None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return hasattr(self, key)
+
+
+def _attr(obj: Any, key: str, default: Any = '') -> Any:
+    """
+    读取 Biopython 元素 attributes 字典中的字段
+
+    把原先嵌套的 safe_get(safe_get(obj, 'attributes', {}), key) 两次
+    调用合并为一次，供热点提取循环使用。
+    """
+    attributes = safe_get(obj, 'attributes') or {}
+    return attributes.get(key, default)
+
+
+# 月份名称到补零数字的映射（PubMed 日期中月份可能是 "Jan" 这类缩写）
+_MONTH_MAP = {
+    'Jan': '01', 'Feb': '02', 'Mar': '03', 'Apr': '04',
+    'May': '05', 'Jun': '06', 'Jul': '07', 'Aug': '08',
+    'Sep': '09', 'Oct': '10', 'Nov': '11', 'Dec': '12'
+}
+
 
 class DetailFetcher(BaseFetcher):
     """详情获取器，通过 PMID 获取文献详细信息"""
-    
+
+    def __init__(self):
+        super().__init__()
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+    async def _acquire_resources(self):
+        await super()._acquire_resources()
+        # 解析是 CPU 密集的纯 Python 代码，用进程池绕开 GIL 跨核并行；
+        # 基类引用计数保证并发进入只建一个池，也不会中途被拆掉
+        self._process_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+    async def _release_resources(self):
+        if self._process_pool is not None:
+            pool, self._process_pool = self._process_pool, None
+            # shutdown(wait=True) 是阻塞调用，放到线程里等待，不卡事件循环
+            await asyncio.to_thread(pool.shutdown, True)
+        await super()._release_resources()
+
     async def fetch(
         self,
         pmid_list: List[str],
-        batch_size: int = 100
-    ) -> List[Dict[str, Any]]:
+        batch_size: int = 100,
+        keep_raw: bool = False
+    ) -> List[ArticleRecord]:
         """
         获取文献详细信息
-        
+
         Args:
             pmid_list: PMID 列表
             batch_size: 每批获取的数量
-        
+            keep_raw: 是否在结果中保留原始解析数据（会显著增加内存占用）
+
         Returns:
             文献详情列表
         """
@@ -29,66 +108,68 @@ class DetailFetcher(BaseFetcher):
         
         self.log_info(f"开始获取 {len(pmid_list)} 篇文献的详细信息")
         
-        # 分批获取
+        # 分批获取，用信号量限制并发，避免同时持有所有批次的解析结果
         all_articles = []
-        tasks = []
-        
-        for i in range(0, len(pmid_list), batch_size):
-            batch = pmid_list[i:i + batch_size]
-            task = self._fetch_batch(batch)
-            tasks.append(task)
-        
-        # 并发执行所有任务
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # 处理结果
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                self.log_error(f"批次 {i} 获取失败", result)
-                continue
-            
-            all_articles.extend(result)
+        semaphore = asyncio.Semaphore(settings.CRAWLER_MAX_CONCURRENCY)
+
+        async def fetch_batch_guarded(pmid_batch: List[str]) -> List[ArticleRecord]:
+            async with semaphore:
+                return await self._fetch_batch(pmid_batch, keep_raw=keep_raw)
+
+        batches = [
+            pmid_list[i:i + batch_size]
+            for i in range(0, len(pmid_list), batch_size)
+        ]
+
+        # 按完成顺序增量消费结果，峰值内存上限为并发数 × 批大小
+        for future in asyncio.as_completed([fetch_batch_guarded(b) for b in batches]):
+            try:
+                all_articles.extend(await future)
+            except Exception as e:
+                self.log_error("批次获取失败", e)
         
         self.log_info(f"成功获取 {len(all_articles)} 篇文献的详细信息")
         
         return all_articles
     
     @retry_with_backoff(max_retries=3)
-    async def _fetch_batch(self, pmid_batch: List[str]) -> List[Dict[str, Any]]:
+    async def _fetch_batch(self, pmid_batch: List[str], keep_raw: bool = False) -> List[ArticleRecord]:
         """
         获取单个批次的文献详情
-        
+
         Args:
             pmid_batch: PMID 批次列表
-        
+            keep_raw: 是否在结果中保留原始解析数据
+
         Returns:
             文献详情列表
         """
         # 等待速率限制
         await self.entrez_client.rate_limiter.acquire()
-        
-        # 获取详情
-        result = self.entrez_client.fetch(pmid_batch, rettype="abstract", retmode="xml")
-        
-        # 解析结果
-        articles = []
-        if 'PubmedArticle' in result:
-            for article_data in result['PubmedArticle']:
-                parsed_article = self._parse_article(article_data)
-                if parsed_article:
-                    articles.append(parsed_article)
-        
+
+        if self._process_pool is not None:
+            # 进程池路径：抓取和解析都在子进程执行，解析跨核并行
+            loop = asyncio.get_running_loop()
+            articles = await loop.run_in_executor(
+                self._process_pool,
+                partial(_fetch_and_parse_batch, pmid_batch, keep_raw)
+            )
+        else:
+            # 未进入上下文管理器时退回线程执行，避免卡住事件循环
+            articles = await asyncio.to_thread(_fetch_and_parse_batch, pmid_batch, keep_raw)
+
         self.log_info(f"批次获取完成: 请求 {len(pmid_batch)} 篇，成功解析 {len(articles)} 篇")
-        
+
         return articles
     
-    def _parse_article(self, article_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def _parse_article(self, article_data: Dict[str, Any], keep_raw: bool = False) -> Optional[ArticleRecord]:
         """
         解析单篇文献数据
-        
+
         Args:
             article_data: 原始文献数据
-        
+            keep_raw: 是否在结果中保留原始解析数据
+
         Returns:
             解析后的文献数据
         """
@@ -153,27 +234,29 @@ class DetailFetcher(BaseFetcher):
             copyright_info = clean_text(article.get('CopyrightInformation', ''))
             coi_statement = clean_text(medline_citation.get('CoiStatement', ''))
             
-            return {
-                'pmid': pmid,
-                'doi': doi,
-                'title': title,
-                'abstract': abstract_text,
-                'journal': journal_info,
-                'authors': authors,
-                'keywords': keywords,
-                'mesh_terms': mesh_terms,
-                'chemicals': chemicals,
-                'publication_types': publication_types,
-                'grants': grants,
-                'other_ids': other_ids,
-                'dates': dates,
-                'pagination': pagination,
-                'language': language,
-                'copyright_info': copyright_info,
-                'coi_statement': coi_statement,
-                'raw_data': article_data  # 保留原始数据以备后用
-            }
-            
+            return ArticleRecord(
+                pmid=pmid,
+                doi=doi,
+                title=title,
+                abstract=abstract_text,
+                journal=journal_info,
+                authors=authors,
+                keywords=keywords,
+                mesh_terms=mesh_terms,
+                chemicals=chemicals,
+                publication_types=publication_types,
+                grants=grants,
+                other_ids=other_ids,
+                dates=dates,
+                pagination=pagination,
+                language=language,
+                copyright_info=copyright_info,
+                coi_statement=coi_statement,
+                # 原始数据默认不保留：它会让每篇文献的内存占用翻倍，
+                # 并使整个解析树无法被及时回收
+                raw_data=article_data if keep_raw else None
+            )
+
         except Exception as e:
             self.log_error(f"解析文献数据失败", e)
             return None
@@ -236,7 +319,10 @@ class DetailFetcher(BaseFetcher):
     def _extract_authors(self, author_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """提取作者信息"""
         authors = []
-        
+        # 绑定到局部变量，循环内走 LOAD_FAST 而不是模块字典查找
+        _sg = safe_get
+        _sgv = safe_get_value
+
         for i, author in enumerate(author_list):
             author_info = {
                 'order': i + 1,
@@ -259,8 +345,8 @@ class DetailFetcher(BaseFetcher):
                 if not isinstance(identifiers, list):
                     identifiers = [identifiers]
                 for identifier in identifiers:
-                    if safe_get(identifier, 'Source') == 'ORCID':
-                        author_info['orcid'] = safe_get_value(identifier)
+                    if _sg(identifier, 'Source') == 'ORCID':
+                        author_info['orcid'] = _sgv(identifier)
             
             # 检查是否为通讯作者
             if author.get('attributes', {}).get('EqualContrib') == 'Y':
@@ -273,9 +359,9 @@ class DetailFetcher(BaseFetcher):
     def _extract_keywords(self, keyword_lists: List[Any]) -> List[Dict[str, str]]:
         """提取关键词"""
         keywords = []
-        
+
         for keyword_list in keyword_lists:
-            owner = safe_get(safe_get(keyword_list, 'attributes', {}), 'Owner', 'NLM')
+            owner = _attr(keyword_list, 'Owner', 'NLM')
             for keyword in keyword_list:
                 if isinstance(keyword, str):
                     keywords.append({
@@ -288,34 +374,37 @@ class DetailFetcher(BaseFetcher):
     def _extract_mesh_terms(self, mesh_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """提取 MeSH 术语"""
         mesh_terms = []
-        
+        # 绑定到局部变量，循环内走 LOAD_FAST 而不是模块字典查找
+        _a = _attr
+        _sgv = safe_get_value
+
         for mesh_heading in mesh_list:
             descriptor = mesh_heading.get('DescriptorName', {})
             if not descriptor:
                 continue
-            
+
             term_info = {
-                'descriptor_name': safe_get_value(descriptor),
-                'descriptor_ui': safe_get(safe_get(descriptor, 'attributes', {}), 'UI', ''),
-                'is_major_topic': safe_get(safe_get(descriptor, 'attributes', {}), 'MajorTopicYN', 'N') == 'Y',
+                'descriptor_name': _sgv(descriptor),
+                'descriptor_ui': _a(descriptor, 'UI', ''),
+                'is_major_topic': _a(descriptor, 'MajorTopicYN', 'N') == 'Y',
                 'qualifiers': []
             }
-            
+
             # 提取限定词
             qualifiers = mesh_heading.get('QualifierName', [])
             if not isinstance(qualifiers, list):
                 qualifiers = [qualifiers]
-            
+
             for qualifier in qualifiers:
                 if qualifier:
                     term_info['qualifiers'].append({
-                        'name': safe_get_value(qualifier),
-                        'ui': safe_get(safe_get(qualifier, 'attributes', {}), 'UI', ''),
-                        'is_major_topic': safe_get(safe_get(qualifier, 'attributes', {}), 'MajorTopicYN', 'N') == 'Y'
+                        'name': _sgv(qualifier),
+                        'ui': _a(qualifier, 'UI', ''),
+                        'is_major_topic': _a(qualifier, 'MajorTopicYN', 'N') == 'Y'
                     })
-            
+
             mesh_terms.append(term_info)
-        
+
         return mesh_terms
     
     def _extract_chemicals(self, chemical_list: List[Dict[str, Any]]) -> List[Dict[str, str]]:
@@ -367,7 +456,7 @@ class DetailFetcher(BaseFetcher):
         article_id_list = pubmed_data.get('ArticleIdList', [])
         
         for article_id in article_id_list:
-            id_type = safe_get(safe_get(article_id, 'attributes', {}), 'IdType', '')
+            id_type = _attr(article_id, 'IdType', '')
             if id_type:
                 other_ids[id_type] = str(article_id)
         
@@ -399,7 +488,7 @@ class DetailFetcher(BaseFetcher):
         article_dates = article.get('ArticleDate', [])
         
         for date in article_dates:
-            if safe_get(safe_get(date, 'attributes', {}), 'DateType') == 'Electronic':
+            if _attr(date, 'DateType', None) == 'Electronic':
                 dates['electronic'] = self._format_date(date)
         
         return dates
@@ -410,9 +499,11 @@ class DetailFetcher(BaseFetcher):
             return None
         
         year = date_dict.get('Year', '')
-        month = date_dict.get('Month', '').zfill(2)
-        day = date_dict.get('Day', '').zfill(2)
-        
+        month = date_dict.get('Month', '')
+        month = _MONTH_MAP.get(month, month.zfill(2) if month.isdigit() else '')
+        day = date_dict.get('Day', '')
+        day = day.zfill(2) if day.isdigit() else ''
+
         if year:
             if month and day:
                 return f"{year}-{month}-{day}"
@@ -420,5 +511,31 @@ class DetailFetcher(BaseFetcher):
                 return f"{year}-{month}"
             else:
                 return year
-        
-        return None
\ No newline at end of file
+
+        return None
+
+def _fetch_and_parse_batch(pmid_batch: List[str], keep_raw: bool = False) -> List[ArticleRecord]:
+    """
+    抓取并解析一个批次（进程池工作函数）
+
+    必须定义在模块级才能被 pickle 提交到子进程；在子进程中创建
+    自己的 DetailFetcher 实例来复用解析逻辑。
+
+    Args:
+        pmid_batch: PMID 批次列表
+        keep_raw: 是否在结果中保留原始解析数据
+
+    Returns:
+        文献详情列表
+    """
+    fetcher = DetailFetcher()
+    parsed = []
+    # 流式消费记录：每条记录解析完即可释放，
+    # 不再把整个批次的 XML 结果树一次性物化在内存中
+    for article_data in fetcher.entrez_client.fetch_iter(
+        pmid_batch, rettype="abstract", retmode="xml"
+    ):
+        parsed_article = fetcher._parse_article(article_data, keep_raw=keep_raw)
+        if parsed_article:
+            parsed.append(parsed_article)
+    return parsed
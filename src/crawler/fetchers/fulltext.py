@@ -1,6 +1,9 @@
+import asyncio
+import json
 import os
 from typing import Optional, Dict, Any, List
 from pathlib import Path
+from xml.etree import ElementTree
 import aiofiles
 
 from .base import BaseFetcher
@@ -10,44 +13,67 @@ from src.config.settings import settings
 
 class FulltextFetcher(BaseFetcher):
     """全文获取器，通过 PMC_ID 获取文章全文"""
-    
-    def __init__(self, save_path: Optional[str] = None):
+
+    # 流式下载的分块大小（字节）
+    _CHUNK_SIZE = 65536
+
+
+    def __init__(self, save_path: Optional[str] = None, force_refresh: bool = False):
         """
         初始化全文获取器
-        
+
         Args:
             save_path: 保存全文的路径，默认为 data/fulltext
+            force_refresh: 为 True 时忽略本地已有文件，重新向 PMC 校验/下载
         """
         super().__init__()
         self.save_path = Path(save_path or "data/fulltext")
         self.save_path.mkdir(parents=True, exist_ok=True)
+        self.force_refresh = force_refresh
         
         # PMC 基础 URL
         self.pmc_base_url = "https://www.ncbi.nlm.nih.gov/pmc/articles"
         self.pmc_oai_url = "https://www.ncbi.nlm.nih.gov/pmc/oai/oai.cgi"
+
+        # 预拼好各格式的 URL 模板，热路径上只做一次 format
+        self._url_templates = {
+            'xml': f"{self.pmc_base_url}/{{pmc_id}}/xml/",
+            'pdf': f"{self.pmc_base_url}/{{pmc_id}}/pdf/",
+            'html': f"{self.pmc_base_url}/{{pmc_id}}/",
+        }
+
+    @staticmethod
+    def _norm_pmc(pmc_id: str) -> str:
+        """确保 PMC ID 带 PMC 前缀"""
+        return pmc_id if pmc_id.startswith('PMC') else f'PMC{pmc_id}'
+
+    def _url(self, fmt: str, pmc_id: str) -> str:
+        """根据格式模板构建下载 URL"""
+        return self._url_templates[fmt].format(pmc_id=pmc_id)
     
     async def fetch(
         self,
         pmc_id: str,
-        formats: List[str] = ['xml', 'pdf']
+        formats: List[str] = ['xml', 'pdf'],
+        fetch_metadata: bool = False
     ) -> Dict[str, Any]:
         """
         获取文章全文
-        
+
         Args:
             pmc_id: PMC ID (如 PMC1234567)
             formats: 要获取的格式列表，支持 'xml', 'pdf', 'html'
-        
+            fetch_metadata: 是否额外请求 OAI-PMH 元数据；
+                下游只要全文时默认跳过，省一次 PMC 往返
+
         Returns:
             包含获取结果的字典
         """
         if not pmc_id:
             return {'error': 'PMC ID 为空'}
-        
-        # 确保 PMC ID 格式正确
-        if not pmc_id.startswith('PMC'):
-            pmc_id = f'PMC{pmc_id}'
-        
+
+        pmc_id = self._norm_pmc(pmc_id)
+
         self.log_info(f"开始获取 {pmc_id} 的全文，格式: {formats}")
         
         result = {
@@ -55,29 +81,128 @@ class FulltextFetcher(BaseFetcher):
             'formats': {},
             'metadata': {}
         }
-        
-        # 获取元数据
-        metadata = await self._fetch_metadata(pmc_id)
-        if metadata:
-            result['metadata'] = metadata
-        
-        # 获取不同格式的全文
+
+        # 元数据和各格式下载互相独立，并发执行避免串行等待
+        fetchers = {
+            'xml': self._fetch_xml,
+            'pdf': self._fetch_pdf,
+            'html': self._fetch_html,
+        }
+        tasks = {}
+        if fetch_metadata:
+            tasks['metadata'] = asyncio.create_task(self._fetch_metadata(pmc_id))
         for fmt in formats:
-            if fmt == 'xml':
-                xml_result = await self._fetch_xml(pmc_id)
-                if xml_result:
-                    result['formats']['xml'] = xml_result
-            elif fmt == 'pdf':
-                pdf_result = await self._fetch_pdf(pmc_id)
-                if pdf_result:
-                    result['formats']['pdf'] = pdf_result
-            elif fmt == 'html':
-                html_result = await self._fetch_html(pmc_id)
-                if html_result:
-                    result['formats']['html'] = html_result
-        
+            if fmt in fetchers:
+                tasks[fmt] = asyncio.create_task(fetchers[fmt](pmc_id))
+
+        results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+        for key, task_result in zip(tasks, results):
+            if isinstance(task_result, Exception):
+                self.log_error(f"获取 {pmc_id} 的 {key} 失败", task_result)
+                continue
+            if not task_result:
+                continue
+            if key == 'metadata':
+                result['metadata'] = task_result
+            else:
+                result['formats'][key] = task_result
+
         return result
     
+    async def _stream_to_file(self, response, file_path: Path) -> int:
+        """流式写入临时文件，下载完整后原子替换到目标路径
+
+        中途断流只会留下 .part 临时文件并被清理，
+        截断的半成品不会落在最终路径上被 _local_copy 当成有效缓存。
+
+        Returns:
+            写入的字节数
+        """
+        tmp_path = file_path.with_name(f"{file_path.name}.part")
+        file_size = 0
+        try:
+            async with aiofiles.open(tmp_path, 'wb') as f:
+                async for chunk in response.aiter_bytes(self._CHUNK_SIZE):
+                    await f.write(chunk)
+                    file_size += len(chunk)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        os.replace(tmp_path, file_path)
+        return file_size
+
+    @staticmethod
+    async def _write_bytes(file_path: Path, data: bytes) -> None:
+        """
+        单次整体写盘
+
+        aiofiles 每个操作都要经线程池转发一次，对一次性的大块写入
+        反而比直接把同步写丢进线程更慢；流式分块写仍然用 aiofiles。
+        """
+        await asyncio.to_thread(file_path.write_bytes, data)
+
+    def _meta_path(self, file_path: Path) -> Path:
+        """返回文件对应的 ETag/Last-Modified 边车文件路径"""
+        return file_path.with_name(f"{file_path.name}.meta.json")
+
+    def _conditional_headers(self, file_path: Path) -> Dict[str, str]:
+        """
+        构建条件请求头
+
+        本地文件和边车文件都存在时，带上 If-None-Match/If-Modified-Since，
+        让 PMC 在内容未变化时返回 304，跳过整个响应体。
+        """
+        headers: Dict[str, str] = {}
+        meta_path = self._meta_path(file_path)
+        if not (file_path.exists() and meta_path.exists()):
+            return headers
+
+        try:
+            meta = json.loads(meta_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return headers
+
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def _save_meta(self, file_path: Path, response) -> None:
+        """保存响应的缓存校验头，供下次条件请求使用"""
+        etag = response.headers.get('etag')
+        last_modified = response.headers.get('last-modified')
+        if not (etag or last_modified):
+            return
+
+        meta = {'etag': etag, 'last_modified': last_modified}
+        self._meta_path(file_path).write_text(json.dumps(meta), encoding='utf-8')
+
+    def _local_copy(self, file_path: Path) -> Optional[Dict[str, Any]]:
+        """
+        本地已有文件时直接返回缓存结果
+
+        force_refresh 为 True 时始终返回 None，走网络重新校验下载。
+        """
+        if self.force_refresh or not file_path.exists():
+            return None
+        return {
+            'status': 'cached',
+            'file_path': str(file_path),
+            'file_size': file_path.stat().st_size,
+            'url': None
+        }
+
+    def _not_modified_result(self, file_path: Path, url: str) -> Dict[str, Any]:
+        """本地副本仍然有效时的返回结果"""
+        return {
+            'status': 'not_modified',
+            'file_path': str(file_path),
+            'file_size': file_path.stat().st_size,
+            'url': url
+        }
+
     @retry_with_backoff(max_retries=3)
     async def _fetch_metadata(self, pmc_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -99,16 +224,45 @@ class FulltextFetcher(BaseFetcher):
             
             response = await self.http_client.get(self.pmc_oai_url, params=params)
             response.raise_for_status()
-            
-            # 这里简化处理，实际需要解析 XML 响应
-            return {
-                'status': 'success',
-                'url': str(response.url)
-            }
-            
+
+            metadata = self._parse_oai_metadata(response.content)
+            metadata['status'] = 'success'
+            metadata['url'] = str(response.url)
+            return metadata
+
         except Exception as e:
             self.log_error(f"获取 {pmc_id} 元数据失败", e)
             return None
+
+    @staticmethod
+    def _parse_oai_metadata(content: bytes) -> Dict[str, Any]:
+        """
+        解析 OAI-PMH 响应中的 Dublin Core 元数据
+
+        Args:
+            content: OAI-PMH XML 响应内容
+
+        Returns:
+            元数据字典（title/creators/date/identifier 等）
+        """
+        metadata: Dict[str, Any] = {}
+        try:
+            root = ElementTree.fromstring(content)
+        except ElementTree.ParseError:
+            return metadata
+
+        # 按本地标签名取 dc 字段，避免硬编码命名空间前缀
+        for elem in root.iter():
+            tag = elem.tag.rsplit('}', 1)[-1]
+            text = (elem.text or '').strip()
+            if not text:
+                continue
+            if tag == 'creator':
+                metadata.setdefault('creators', []).append(text)
+            elif tag in ('title', 'date', 'identifier', 'source', 'description'):
+                metadata.setdefault(tag, text)
+
+        return metadata
     
     @retry_with_backoff(max_retries=3)
     async def _fetch_xml(self, pmc_id: str) -> Optional[Dict[str, Any]]:
@@ -122,23 +276,31 @@ class FulltextFetcher(BaseFetcher):
             XML 文件信息
         """
         try:
-            # 构建 XML URL
-            xml_url = f"{self.pmc_base_url}/{pmc_id}/xml/"
-            
-            response = await self.http_client.get(xml_url)
-            response.raise_for_status()
-            
-            # 保存文件
-            file_path = self.save_path / f"{pmc_id}.xml"
-            async with aiofiles.open(file_path, 'wb') as f:
-                await f.write(response.content)
-            
+            xml_url = self._url('xml', pmc_id)
+            file_path = self.save_path.joinpath(f"{pmc_id}.xml")
+
+            cached = self._local_copy(file_path)
+            if cached:
+                return cached
+
+            # 流式下载，边收边写盘，避免把整个响应体读入内存
+            async with self.http_client.stream(
+                'GET', xml_url, headers=self._conditional_headers(file_path)
+            ) as response:
+                if response.status_code == 304:
+                    self.log_info(f"{pmc_id} 的 XML 全文未变化，使用本地副本")
+                    return self._not_modified_result(file_path, xml_url)
+                response.raise_for_status()
+
+                file_size = await self._stream_to_file(response, file_path)
+                self._save_meta(file_path, response)
+
             self.log_info(f"成功保存 {pmc_id} 的 XML 全文到 {file_path}")
-            
+
             return {
                 'status': 'success',
                 'file_path': str(file_path),
-                'file_size': len(response.content),
+                'file_size': file_size,
                 'url': xml_url
             }
             
@@ -158,30 +320,35 @@ class FulltextFetcher(BaseFetcher):
             PDF 文件信息
         """
         try:
-            # 构建 PDF URL
-            pdf_url = f"{self.pmc_base_url}/{pmc_id}/pdf/"
-            
-            # 先检查 PDF 是否可用
-            head_response = await self.http_client.client.head(pdf_url)
-            if head_response.status_code != 200:
-                self.log_warning(f"{pmc_id} 没有可用的 PDF 版本")
-                return None
-            
-            # 下载 PDF
-            response = await self.http_client.get(pdf_url)
-            response.raise_for_status()
-            
-            # 保存文件
-            file_path = self.save_path / f"{pmc_id}.pdf"
-            async with aiofiles.open(file_path, 'wb') as f:
-                await f.write(response.content)
-            
+            pdf_url = self._url('pdf', pmc_id)
+            file_path = self.save_path.joinpath(f"{pmc_id}.pdf")
+
+            cached = self._local_copy(file_path)
+            if cached:
+                return cached
+
+            # 直接 GET，通过状态码判断是否有 PDF，省掉一次 HEAD 往返
+            # 流式下载，PDF 可能有几十 MB，按块写盘控制内存占用
+            async with self.http_client.stream(
+                'GET', pdf_url, headers=self._conditional_headers(file_path)
+            ) as response:
+                if response.status_code == 404:
+                    self.log_warning(f"{pmc_id} 没有可用的 PDF 版本")
+                    return None
+                if response.status_code == 304:
+                    self.log_info(f"{pmc_id} 的 PDF 全文未变化，使用本地副本")
+                    return self._not_modified_result(file_path, pdf_url)
+                response.raise_for_status()
+
+                file_size = await self._stream_to_file(response, file_path)
+                self._save_meta(file_path, response)
+
             self.log_info(f"成功保存 {pmc_id} 的 PDF 全文到 {file_path}")
-            
+
             return {
                 'status': 'success',
                 'file_path': str(file_path),
-                'file_size': len(response.content),
+                'file_size': file_size,
                 'url': pdf_url
             }
             
@@ -201,23 +368,31 @@ class FulltextFetcher(BaseFetcher):
             HTML 文件信息
         """
         try:
-            # 构建 HTML URL
-            html_url = f"{self.pmc_base_url}/{pmc_id}/"
-            
-            response = await self.http_client.get(html_url)
+            html_url = self._url('html', pmc_id)
+            file_path = self.save_path.joinpath(f"{pmc_id}.html")
+
+            cached = self._local_copy(file_path)
+            if cached:
+                return cached
+
+            response = await self.http_client.get(
+                html_url, headers=self._conditional_headers(file_path)
+            )
+            if response.status_code == 304:
+                self.log_info(f"{pmc_id} 的 HTML 全文未变化，使用本地副本")
+                return self._not_modified_result(file_path, html_url)
             response.raise_for_status()
-            
-            # 保存文件
-            file_path = self.save_path / f"{pmc_id}.html"
-            async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
-                await f.write(response.text)
-            
+
+            # 直接落原始字节，不做整页 decode+re-encode；需要字符串时读取方再解码
+            await self._write_bytes(file_path, response.content)
+            self._save_meta(file_path, response)
+
             self.log_info(f"成功保存 {pmc_id} 的 HTML 全文到 {file_path}")
-            
+
             return {
                 'status': 'success',
                 'file_path': str(file_path),
-                'file_size': len(response.text),
+                'file_size': len(response.content),
                 'url': html_url
             }
             
@@ -237,37 +412,29 @@ class FulltextFetcher(BaseFetcher):
         """
         if not pmc_id:
             return {'xml': False, 'pdf': False, 'html': False}
-        
-        # 确保 PMC ID 格式正确
-        if not pmc_id.startswith('PMC'):
-            pmc_id = f'PMC{pmc_id}'
-        
+
+        pmc_id = self._norm_pmc(pmc_id)
+
+
         availability = {
             'xml': False,
             'pdf': False,
             'html': False
         }
         
-        # 检查各格式是否可用
-        try:
-            # XML 通常都可用
-            xml_url = f"{self.pmc_base_url}/{pmc_id}/xml/"
-            xml_response = await self.http_client.client.head(xml_url)
-            availability['xml'] = xml_response.status_code == 200
-            
-            # PDF 可能不可用
-            pdf_url = f"{self.pmc_base_url}/{pmc_id}/pdf/"
-            pdf_response = await self.http_client.client.head(pdf_url)
-            availability['pdf'] = pdf_response.status_code == 200
-            
-            # HTML 通常都可用
-            html_url = f"{self.pmc_base_url}/{pmc_id}/"
-            html_response = await self.http_client.client.head(html_url)
-            availability['html'] = html_response.status_code == 200
-            
-        except Exception as e:
-            self.log_error(f"检查 {pmc_id} 全文可用性失败", e)
-        
+        # 三个 HEAD 探测互相独立，并发发出
+        urls = {fmt: self._url(fmt, pmc_id) for fmt in ('xml', 'pdf', 'html')}
+        responses = await asyncio.gather(
+            *(self.http_client.client.head(url) for url in urls.values()),
+            return_exceptions=True
+        )
+
+        for fmt, response in zip(urls, responses):
+            if isinstance(response, Exception):
+                self.log_error(f"检查 {pmc_id} {fmt} 可用性失败", response)
+            else:
+                availability[fmt] = response.status_code == 200
+
         return availability
     
     def get_local_file(self, pmc_id: str, format: str = 'xml') -> Optional[Path]:
@@ -281,11 +448,11 @@ class FulltextFetcher(BaseFetcher):
         Returns:
             文件路径或 None
         """
-        if not pmc_id.startswith('PMC'):
-            pmc_id = f'PMC{pmc_id}'
-        
-        file_path = self.save_path / f"{pmc_id}.{format}"
-        
+        pmc_id = self._norm_pmc(pmc_id)
+
+        file_path = self.save_path.joinpath(f"{pmc_id}.{format}")
+
+
         if file_path.exists():
             return file_path
         
@@ -9,7 +9,16 @@ from src.models import Article
 
 class ReferencesFetcher(BaseFetcher):
     """引用关系获取器，获取文献的引用和被引用关系"""
-    
+
+    # 每次 elink 请求携带的 PMID 数量
+    _ELINK_CHUNK_SIZE = 200
+
+    def __init__(self):
+        """初始化引用关系获取器"""
+        super().__init__()
+        # 批次内的 PMID 查库缓存：热门文献在不同文章的引用列表里反复出现
+        self._exists_cache: Dict[str, Dict[str, Any]] = {}
+
     async def fetch(
         self,
         pmid_list: List[str],
@@ -17,255 +26,276 @@ class ReferencesFetcher(BaseFetcher):
     ) -> Dict[str, Dict[str, Any]]:
         """
         获取文献的引用关系
-        
+
+        elink 支持一次请求携带多个 ID，按块批量调用，
+        而不是每个 PMID 单独发一次请求。
+
         Args:
             pmid_list: PMID 列表
             fetch_types: 要获取的类型列表
                 - 'refs': 获取该文献引用的文献
                 - 'citedin': 获取引用该文献的文献
-        
+
         Returns:
             引用关系字典，键为 PMID
         """
         if not pmid_list:
             return {}
-        
+
         self.log_info(f"开始获取 {len(pmid_list)} 篇文献的引用关系")
-        
-        # 并发获取所有文献的引用关系
-        tasks = []
-        for pmid in pmid_list:
-            task = self._fetch_single_references(pmid, fetch_types)
-            tasks.append(task)
-        
-        # 执行所有任务
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # 整理结果
-        references_dict = {}
-        for i, result in enumerate(results):
-            pmid = pmid_list[i]
-            if isinstance(result, Exception):
-                self.log_error(f"PMID {pmid} 引用关系获取失败", result)
-                references_dict[pmid] = {'error': str(result)}
-            else:
-                references_dict[pmid] = result
-        
+
+        # 缓存只在单次批量调用内有效，避免跨批次返回过期数据
+        self._exists_cache.clear()
+
+        references_dict: Dict[str, Dict[str, Any]] = {
+            pmid: {'pmid': pmid, 'references': [], 'cited_by': []}
+            for pmid in pmid_list
+        }
+
+        link_types = []
+        if 'refs' in fetch_types:
+            link_types.append(('pubmed_pubmed_refs', 'references'))
+        if 'citedin' in fetch_types:
+            link_types.append(('pubmed_pubmed_citedin', 'cited_by'))
+
+        chunks = [
+            pmid_list[i:i + self._ELINK_CHUNK_SIZE]
+            for i in range(0, len(pmid_list), self._ELINK_CHUNK_SIZE)
+        ]
+
+        for linkname, result_key in link_types:
+            # 各块并发请求，由基类信号量限制在途数量
+            chunk_results = await asyncio.gather(
+                *(
+                    self._bounded(self._fetch_links_batch(chunk, linkname))
+                    for chunk in chunks
+                ),
+                return_exceptions=True
+            )
+
+            for chunk, links_by_pmid in zip(chunks, chunk_results):
+                if isinstance(links_by_pmid, Exception):
+                    self.log_error(f"批量获取 {linkname} 失败", links_by_pmid)
+                    for pmid in chunk:
+                        references_dict[pmid]['error'] = str(links_by_pmid)
+                    continue
+
+                # 一次 IN 查询检查本块涉及的所有链接 PMID，避免逐条查库
+                all_linked = {
+                    linked_pmid
+                    for linked_pmids in links_by_pmid.values()
+                    for linked_pmid in linked_pmids
+                    if linked_pmid
+                }
+                existing_map = await self._bulk_check_articles(all_linked)
+
+                for pmid, linked_pmids in links_by_pmid.items():
+                    entry = references_dict.get(pmid)
+                    if entry is None:
+                        continue
+                    if result_key == 'references':
+                        entry['references'] = self._build_references(linked_pmids, existing_map)
+                    else:
+                        entry['cited_by'] = self._build_cited_by(linked_pmids, existing_map)
+
         self.log_info(f"成功获取 {len([r for r in references_dict.values() if 'error' not in r])} 篇文献的引用关系")
-        
+
         return references_dict
-    
+
     @retry_with_backoff(max_retries=3)
-    async def _fetch_single_references(
+    async def _fetch_links_batch(
         self,
-        pmid: str,
-        fetch_types: List[str]
-    ) -> Dict[str, Any]:
+        pmid_chunk: List[str],
+        linkname: str
+    ) -> Dict[str, List[str]]:
         """
-        获取单篇文献的引用关系
-        
+        批量获取一组 PMID 的链接关系
+
+        ID 以列表形式传给 elink，每个输入 ID 返回独立的 LinkSet，
+        据此还原出每个 PMID 各自的链接列表。
+
         Args:
-            pmid: PMID
-            fetch_types: 要获取的类型列表
-        
+            pmid_chunk: PMID 列表（单块）
+            linkname: 链接类型
+
         Returns:
-            引用关系数据
+            {pmid: 链接到的 PMID 列表}
         """
-        result = {
-            'pmid': pmid,
-            'references': [],  # 该文献引用的文献
-            'cited_by': []     # 引用该文献的文献
-        }
-        
-        # 获取引用的文献（该文献的参考文献）
-        if 'refs' in fetch_types:
-            refs = await self._fetch_references(pmid)
-            result['references'] = refs
-        
-        # 获取被引用的文献（引用该文献的文献）
-        if 'citedin' in fetch_types:
-            cited_by = await self._fetch_cited_by(pmid)
-            result['cited_by'] = cited_by
-        
-        return result
-    
-    async def _fetch_references(self, pmid: str) -> List[Dict[str, Any]]:
+        # 等待速率限制
+        await self.entrez_client.rate_limiter.acquire()
+
+        # Entrez 底层是阻塞的 urllib，放到线程里执行才能真正并发
+        result = await asyncio.to_thread(
+            self.entrez_client.elink, id=list(pmid_chunk), linkname=linkname
+        )
+
+        links_by_pmid: Dict[str, List[str]] = {}
+        for link_set in result or []:
+            id_list = link_set.get('IdList', [])
+            if not id_list:
+                continue
+            pmid = str(id_list[0])
+
+            linked_pmids: List[str] = []
+            for link_set_db in link_set.get('LinkSetDb', []):
+                if link_set_db.get('LinkName') == linkname:
+                    linked_pmids = [
+                        str(link.get('Id', ''))
+                        for link in link_set_db.get('Link', [])
+                    ]
+                    break
+
+            links_by_pmid[pmid] = linked_pmids
+
+        return links_by_pmid
+
+    def _build_references(
+        self,
+        linked_pmids: List[str],
+        existing_map: Dict[str, Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
         """
-        获取文献引用的参考文献
-        
+        将参考文献 PMID 列表组装成引用信息
+
         Args:
-            pmid: PMID
-        
+            linked_pmids: 参考文献 PMID 列表
+            existing_map: 批量查库得到的 {pmid: 库内信息} 映射
+
         Returns:
             参考文献列表
         """
-        try:
-            # 等待速率限制
-            await self.entrez_client.rate_limiter.acquire()
-            
-            # 使用 elink 获取引用关系
-            result = self.entrez_client.elink(
-                id=pmid,
-                linkname="pubmed_pubmed_refs"
-            )
-            
-            references = []
-            
-            # 解析结果
-            if result and len(result) > 0:
-                link_set_db_list = result[0].get('LinkSetDb', [])
-                
-                for link_set_db in link_set_db_list:
-                    if link_set_db.get('LinkName') == 'pubmed_pubmed_refs':
-                        links = link_set_db.get('Link', [])
-                        
-                        for i, link in enumerate(links):
-                            ref_pmid = link.get('Id', '')
-                            if ref_pmid:
-                                ref_info = {
-                                    'cited_pmid': ref_pmid,
-                                    'reference_order': i + 1
-                                }
-                                
-                                # 检查数据库中是否存在该文献
-                                existing_info = await self._check_article_exists(ref_pmid)
-                                if existing_info:
-                                    ref_info.update(existing_info)
-                                
-                                references.append(ref_info)
-                        
-                        break
-            
-            self.log_info(f"PMID {pmid} 找到 {len(references)} 篇参考文献")
-            return references
-            
-        except Exception as e:
-            self.log_error(f"获取 PMID {pmid} 的参考文献失败", e)
-            return []
-    
-    async def _fetch_cited_by(self, pmid: str) -> List[Dict[str, Any]]:
+        references = []
+        for i, ref_pmid in enumerate(linked_pmids):
+            if not ref_pmid:
+                continue
+            ref_info = {
+                'cited_pmid': ref_pmid,
+                'reference_order': i + 1
+            }
+
+            existing_info = existing_map.get(ref_pmid)
+            if existing_info:
+                ref_info.update(existing_info)
+
+            references.append(ref_info)
+        return references
+
+    def _build_cited_by(
+        self,
+        linked_pmids: List[str],
+        existing_map: Dict[str, Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
         """
-        获取引用该文献的文献
-        
+        将引用方 PMID 列表组装成被引信息
+
         Args:
-            pmid: PMID
-        
+            linked_pmids: 引用该文献的 PMID 列表
+            existing_map: 批量查库得到的 {pmid: 库内信息} 映射
+
         Returns:
             引用文献列表
         """
-        try:
-            # 等待速率限制
-            await self.entrez_client.rate_limiter.acquire()
-            
-            # 使用 elink 获取被引用关系
-            result = self.entrez_client.elink(
-                id=pmid,
-                linkname="pubmed_pubmed_citedin"
-            )
-            
-            cited_by = []
-            
-            # 解析结果
-            if result and len(result) > 0:
-                link_set_db_list = result[0].get('LinkSetDb', [])
-                
-                for link_set_db in link_set_db_list:
-                    if link_set_db.get('LinkName') == 'pubmed_pubmed_citedin':
-                        links = link_set_db.get('Link', [])
-                        
-                        for link in links:
-                            citing_pmid = link.get('Id', '')
-                            if citing_pmid:
-                                citing_info = {
-                                    'citing_pmid': citing_pmid
-                                }
-                                
-                                # 检查数据库中是否存在该文献
-                                existing_info = await self._check_article_exists(citing_pmid)
-                                if existing_info:
-                                    citing_info.update(existing_info)
-                                
-                                cited_by.append(citing_info)
-                        
-                        break
-            
-            self.log_info(f"PMID {pmid} 被 {len(cited_by)} 篇文献引用")
-            return cited_by
-            
-        except Exception as e:
-            self.log_error(f"获取引用 PMID {pmid} 的文献失败", e)
-            return []
-    
-    async def _check_article_exists(self, pmid: str) -> Optional[Dict[str, str]]:
+        cited_by = []
+        for citing_pmid in linked_pmids:
+            if not citing_pmid:
+                continue
+            citing_info = {
+                'citing_pmid': citing_pmid
+            }
+
+            existing_info = existing_map.get(citing_pmid)
+            if existing_info:
+                citing_info.update(existing_info)
+
+            cited_by.append(citing_info)
+        return cited_by
+
+    async def _bulk_check_articles(self, pmids) -> Dict[str, Dict[str, Any]]:
         """
-        检查文献是否存在于数据库中
-        
+        批量检查一组文献是否存在于数据库中
+
+        用一条 IN 查询代替逐个 PMID 的单独查询和会话创建。
+        同步的 SQLAlchemy 查询放到线程里执行，避免阻塞事件循环、
+        拖停其他在途的 HTTP 请求。
+
         Args:
-            pmid: PMID
-        
+            pmids: PMID 集合或列表
+
         Returns:
-            如果存在，返回文献的 DOI 和 PMC_ID；否则返回 None
+            {pmid: {'doi', 'pmc_id', 'exists_in_db'}} 映射
         """
+        pmid_list = [pmid for pmid in pmids if pmid]
+        if not pmid_list:
+            return {}
+
+        # 命中缓存的直接复用，只查库补齐缺口
+        result = {
+            pmid: self._exists_cache[pmid]
+            for pmid in pmid_list
+            if pmid in self._exists_cache
+        }
+        missing = [pmid for pmid in pmid_list if pmid not in self._exists_cache]
+
+        if missing:
+            fetched = await asyncio.to_thread(self._bulk_check_articles_sync, missing)
+            self._exists_cache.update(fetched)
+            result.update(fetched)
+
+        return result
+
+    def _bulk_check_articles_sync(self, pmid_list: List[str]) -> Dict[str, Dict[str, Any]]:
+        """_bulk_check_articles 的同步查询部分，在线程中运行"""
         try:
             with get_db() as db:
-                article = db.query(Article).filter(Article.pmid == pmid).first()
-                if article:
-                    return {
-                        'doi': article.doi,
-                        'pmc_id': article.pmc_id,
-                        'exists_in_db': True
-                    }
-                else:
-                    return {
-                        'exists_in_db': False
-                    }
+                rows = (
+                    db.query(Article.pmid, Article.doi, Article.pmc_id)
+                    .filter(Article.pmid.in_(pmid_list))
+                    .all()
+                )
         except Exception as e:
-            self.log_error(f"检查 PMID {pmid} 是否存在时出错", e)
-            return None
-    
+            self.log_error("批量检查文献是否存在时出错", e)
+            return {}
+
+        found = {
+            str(pmid): {'doi': doi, 'pmc_id': pmc_id, 'exists_in_db': True}
+            for pmid, doi, pmc_id in rows
+        }
+        return {
+            pmid: found.get(pmid, {'exists_in_db': False})
+            for pmid in pmid_list
+        }
+
     async def fetch_citation_count(self, pmid_list: List[str]) -> Dict[str, int]:
         """
         获取文献的被引用次数
-        
+
+        只需要数量，不需要每篇引用文献的详情，
+        直接按块 elink 拿链接列表取长度，跳过数据库检查。
+
         Args:
             pmid_list: PMID 列表
-        
+
         Returns:
             被引用次数字典，键为 PMID
         """
-        citation_counts = {}
-        
-        # 并发获取所有文献的被引用数
-        tasks = []
-        for pmid in pmid_list:
-            task = self._get_citation_count(pmid)
-            tasks.append(task)
-        
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        for i, result in enumerate(results):
-            pmid = pmid_list[i]
-            if isinstance(result, Exception):
-                self.log_error(f"PMID {pmid} 引用次数获取失败", result)
-                citation_counts[pmid] = 0
-            else:
-                citation_counts[pmid] = result
-        
-        return citation_counts
-    
-    async def _get_citation_count(self, pmid: str) -> int:
-        """
-        获取单篇文献的被引用次数
-        
-        Args:
-            pmid: PMID
-        
-        Returns:
-            被引用次数
-        """
-        try:
-            cited_by = await self._fetch_cited_by(pmid)
-            return len(cited_by)
-        except Exception as e:
-            self.log_error(f"获取 PMID {pmid} 被引用次数失败", e)
-            return 0
\ No newline at end of file
+        citation_counts = {pmid: 0 for pmid in pmid_list}
+
+        chunks = [
+            pmid_list[i:i + self._ELINK_CHUNK_SIZE]
+            for i in range(0, len(pmid_list), self._ELINK_CHUNK_SIZE)
+        ]
+
+        for chunk in chunks:
+            try:
+                links_by_pmid = await self._fetch_links_batch(
+                    chunk, "pubmed_pubmed_citedin"
+                )
+            except Exception as e:
+                self.log_error("批量获取被引次数失败", e)
+                continue
+
+            for pmid, linked_pmids in links_by_pmid.items():
+                if pmid in citation_counts:
+                    citation_counts[pmid] = len(linked_pmids)
+
+        return citation_counts
\ No newline at end of file
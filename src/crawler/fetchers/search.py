@@ -1,5 +1,6 @@
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Optional, Dict, Any
 import asyncio
+import itertools
 
 from .base import BaseFetcher
 from src.crawler.utils import retry_with_backoff
@@ -45,28 +46,32 @@ class SearchFetcher(BaseFetcher):
         self.log_info(f"找到 {total_count} 篇文献，将获取 {actual_max} 篇")
         
         # 分批获取所有 PMID
-        all_pmids = []
         tasks = []
-        
+
         for start in range(0, actual_max, batch_size):
             end = min(start + batch_size, actual_max)
             batch_retmax = end - start
             
-            # 创建异步任务
-            task = self._search_batch(keyword, retmax=batch_retmax, retstart=start)
+            # 创建异步任务（由基类信号量限制在途数量）
+            task = self._bounded(
+                self._search_batch(keyword, retmax=batch_retmax, retstart=start)
+            )
             tasks.append(task)
         
         # 并发执行所有搜索任务
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
-        # 处理结果
-        for i, result in enumerate(results):
+        # 失败批次单独记录日志（zip 回各批次的 retstart，不用下标回查）
+        for start, result in zip(range(0, actual_max, batch_size), results):
             if isinstance(result, Exception):
-                self.log_error(f"批次 {i} 搜索失败", result)
-                continue
-            
-            if 'IdList' in result:
-                all_pmids.extend(result['IdList'])
+                self.log_error(f"批次 retstart={start} 搜索失败", result)
+
+        # 一次性拼出全部 PMID，避免循环里反复 extend 扩容
+        all_pmids = list(itertools.chain.from_iterable(
+            result['IdList']
+            for result in results
+            if not isinstance(result, Exception) and 'IdList' in result
+        ))
         
         self.log_info(f"成功获取 {len(all_pmids)} 个 PMID")
         
@@ -81,6 +86,78 @@ class SearchFetcher(BaseFetcher):
             }
         }
     
+    async def count(self, keyword: str) -> int:
+        """
+        只查询命中总数，不获取任何 PMID
+
+        retmax=0 的 esearch 是最轻量的请求，适合在重爬前
+        检测结果集是否发生变化。
+
+        Args:
+            keyword: 搜索关键词
+
+        Returns:
+            命中文献总数
+        """
+        result = await self._search_batch(keyword, retmax=0, retstart=0)
+        return int(result.get('Count', 0))
+
+    async def fetch_iter(
+        self,
+        keyword: str,
+        max_results: Optional[int] = None,
+        batch_size: int = 100
+    ) -> AsyncIterator[List[str]]:
+        """
+        流式搜索文献，逐批产出 PMID 列表
+
+        与 fetch 不同，每个批次一完成就产出，下游可以立刻开始
+        处理，不必等最慢的批次；代价是产出顺序为完成顺序，
+        不保证按相关性排列。
+
+        Args:
+            keyword: 搜索关键词
+            max_results: 最大结果数，None 表示获取所有结果
+            batch_size: 每批获取的数量
+
+        Yields:
+            每个批次的 PMID 列表
+        """
+        self.log_info(f"开始流式搜索关键词: {keyword}")
+
+        # 首次搜索，获取总数
+        initial_result = await self._search_batch(keyword, retmax=1, retstart=0)
+        total_count = int(initial_result.get('Count', 0))
+
+        if total_count == 0:
+            self.log_warning(f"关键词 '{keyword}' 没有搜索到结果")
+            return
+
+        actual_max = min(total_count, max_results) if max_results else total_count
+        self.log_info(f"找到 {total_count} 篇文献，将获取 {actual_max} 篇")
+
+        tasks = [
+            asyncio.create_task(
+                self._bounded(self._search_batch(
+                    keyword,
+                    retmax=min(start + batch_size, actual_max) - start,
+                    retstart=start
+                ))
+            )
+            for start in range(0, actual_max, batch_size)
+        ]
+
+        for future in asyncio.as_completed(tasks):
+            try:
+                result = await future
+            except Exception as e:
+                self.log_error("批次搜索失败", e)
+                continue
+
+            id_list = result.get('IdList')
+            if id_list:
+                yield list(id_list)
+
     @retry_with_backoff(max_retries=3)
     async def _search_batch(self, keyword: str, retmax: int, retstart: int) -> dict:
         """
@@ -96,9 +173,10 @@ class SearchFetcher(BaseFetcher):
         """
         # 等待速率限制
         await self.entrez_client.rate_limiter.acquire()
-        
-        # 执行搜索
-        result = self.entrez_client.search(
+
+        # Entrez 底层是阻塞的 urllib，放到线程里执行才能真正并发
+        result = await asyncio.to_thread(
+            self.entrez_client.search,
             term=keyword,
             retmax=retmax,
             retstart=retstart,
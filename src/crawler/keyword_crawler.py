@@ -14,40 +14,132 @@ import asyncio
 import argparse
 import json
 import csv
-from typing import List, Dict, Any, Optional
+import os
+import re
+import sqlite3
+import time
+from typing import AsyncIterator, List, Dict, Any, Optional
 from datetime import datetime, date
 from pathlib import Path
 import logging
+import logging.handlers
 import sys
 
+import aiofiles
+import httpx
+
+# orjson 为可选依赖：C 实现的序列化比标准库快一个数量级
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 from src.crawler.pubmed_crawler import PubMedCrawler
+from src.crawler.fetchers.base import BaseFetcher
+from src.crawler.utils import HTTPClient, RateLimiter, retry_with_backoff
 from src.config.settings import settings
 from src.db.session import get_db
 from src.models import Article
 
-# 配置日志
+# 配置日志：文件写入经 MemoryHandler 缓冲，批量落盘而不是逐条 flush
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler(f'keyword_crawler_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'),
+        logging.handlers.MemoryHandler(
+            capacity=1000,
+            flushLevel=logging.ERROR,
+            target=logging.FileHandler(
+                f'keyword_crawler_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'
+            )
+        ),
         logging.StreamHandler()
     ]
 )
 logger = logging.getLogger(__name__)
 
+# 文件名非法字符，模块加载时编译一次
+_FILENAME_RE = re.compile(r'[<>:"/\\|?*]')
+
+# 日志分隔线，构建一次
+SEP = "=" * 50
+
+
+def _json_dumps(obj: Any) -> str:
+    """序列化为 JSON 字符串，可用时走 orjson"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def _dump_json_file(obj: Any, path: Path):
+    """
+    序列化 JSON 到文件（带缩进），可用时走 orjson
+
+    先写同目录临时文件再 os.replace 原子替换，
+    中断时不会留下截断的半截 JSON 导致下次加载失败。
+    """
+    tmp_path = path.with_name(path.name + '.tmp')
+    if HAS_ORJSON:
+        tmp_path.write_bytes(
+            orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        )
+    else:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(obj, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
 
 class KeywordCrawler:
     """关键词批量爬虫"""
-    
-    def __init__(self, output_dir: str = "crawl_results"):
-        """初始化爬虫"""
+
+    # 跨关键词攒批入库的批大小：单事务提交，摊薄 INSERT 和 fsync 开销
+    _DB_BATCH_SIZE = 500
+
+
+    def __init__(self, output_dir: str = "crawl_results", concurrency: Optional[int] = None):
+        """
+        初始化爬虫
+
+        Args:
+            output_dir: 报告和进度文件的输出目录
+            concurrency: 同时爬取的关键词数，默认取 CRAWLER_MAX_CONCURRENCY
+        """
         self.crawler = PubMedCrawler()
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
-        self.progress_file = self.output_dir / "progress.json"
+        self.progress_file = self.output_dir / "progress.json"  # 旧版进度，仅用于迁移
+        self.progress_db_file = self.output_dir / "progress.db"
         self.stats_file = self.output_dir / "stats.json"
         self.logger = logger
+        self._progress_conn = self._init_progress_db()
+        self.concurrency = concurrency or settings.CRAWLER_MAX_CONCURRENCY
+        # 并发爬取时保护共享统计和进度文件
+        self._stats_lock = asyncio.Lock()
+        # 批量入库缓冲：各关键词的解析结果先攒在这里
+        self._article_buffer: List[Dict[str, Any]] = []
+        self._buffer_lock = asyncio.Lock()
+        # NCBI 限频：有 API key 每秒 10 次，否则 3 次；
+        # 并发关键词共用一个限流器，避免触发 429
+        calls_per_second = 10.0 if settings.PUBMED_API_KEY else 3.0
+        self.rate_limiter = RateLimiter(calls_per_second)
+
+    async def __aenter__(self):
+        """异步上下文管理器入口
+
+        预热共享 HTTP 客户端，整个批次的所有关键词
+        复用同一个连接池，而不是首个请求时才惰性创建。
+        """
+        async with BaseFetcher._client_lock:
+            if BaseFetcher._shared_client is None:
+                BaseFetcher._shared_client = HTTPClient()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """异步上下文管理器出口，统一关闭共享连接池和进度库"""
+        await BaseFetcher.close_all()
+        self._progress_conn.close()
         
     async def crawl_keywords(
         self,
@@ -76,24 +168,35 @@ class KeywordCrawler:
             爬取统计结果
         """
         start_time = datetime.now()
+        # 耗时用单调时钟计量，不受系统时间回拨影响也更轻量
+        start_monotonic = time.monotonic()
         
         # 加载进度
         if force:
-            # 强制重新爬取，清空进度
+            # 强制重新爬取，清空进度；
+            # 旧的逐关键词统计仍保留，用于"结果未变化"检测
             self.logger.info("强制重新爬取模式，忽略之前的进度")
+            previous_stats = (self._load_progress() or {}).get('keyword_stats', {})
+            self._clear_progress()
             progress = {}
             completed_keywords = set()
             pending_keywords = keywords
         else:
-            progress = self._load_progress() if resume else {}
-            completed_keywords = set(progress.get('completed', []))
-            
+            previous_stats = {}
+            # 只加载已完成集合和聚合总数，不反序列化全部逐关键词统计
+            completed_keywords = set(self._load_completed()) if resume else set()
+
             # 过滤已完成的关键词
             pending_keywords = [k for k in keywords if k not in completed_keywords]
-            
+
             if not pending_keywords:
                 self.logger.info("所有关键词已完成爬取（使用 --force 强制重新爬取）")
                 return self._load_stats()
+
+            progress = {}
+            if resume:
+                progress = self._load_totals()
+                progress['errors'] = self._load_errors()
         
         self.logger.info(f"待爬取关键词数: {len(pending_keywords)}")
         
@@ -106,66 +209,147 @@ class KeywordCrawler:
             'total_saved': progress.get('total_saved', 0),
             'total_references': progress.get('total_references', 0),
             'total_fulltext': progress.get('total_fulltext', 0),
-            'keyword_stats': progress.get('keyword_stats', {}),
             'errors': progress.get('errors', [])
         }
-        
-        # 批量爬取
-        for i, keyword in enumerate(pending_keywords, 1):
+
+        # 汇总 CSV 流式写入：关键词一完成就落一行，
+        # 不在内存里攒全量 keyword_stats 等到最后再导出
+        csv_path = self.output_dir / "summary.csv"
+        csv_mode = 'w' if (force or not csv_path.exists()) else 'a'
+        csv_f = open(csv_path, csv_mode, newline='', encoding='utf-8')
+        csv_writer = csv.writer(csv_f)
+        if csv_mode == 'w':
+            csv_writer.writerow([
+                '关键词', '找到文献数', '获取文献数', '保存文献数',
+                '引用关系数', '全文数', '耗时(秒)', '错误'
+            ])
+
+
+        # 批量爬取：关键词之间互相独立，有界并发执行
+        sem = asyncio.Semaphore(self.concurrency)
+        total_pending = len(pending_keywords)
+
+        # 过滤条件整个批次不变，后缀只构建一次；
+        # 无过滤条件（最常见的 CLI 用法）时特化成恒等函数，
+        # 循环里不再做条件判断和字符串拼接
+        filter_suffix = self._build_filter_suffix(filters)
+        if filter_suffix:
+            def query_fn(k: str) -> str:
+                return f"{k} AND {filter_suffix}"
+        else:
+            def query_fn(k: str) -> str:
+                return k
+
+        async def _crawl_one(index: int, keyword: str):
             try:
-                self.logger.info(f"\n{'='*50}")
-                self.logger.info(f"正在爬取关键词 {i}/{len(pending_keywords)}: {keyword}")
-                self.logger.info(f"{'='*50}")
-                
-                # 构建搜索查询
-                search_query = self._build_search_query(keyword, filters)
-                
-                # 执行爬取
-                stats = await self.crawler.crawl_by_keyword(
-                    keyword=search_query,
-                    max_results=max_results_per_keyword,
-                    save_to_db=save_to_db,
-                    fetch_references=fetch_references,
-                    fetch_fulltext=fetch_fulltext
-                )
-                
-                # 更新统计
-                overall_stats['keyword_stats'][keyword] = stats
-                overall_stats['total_articles'] += stats.get('articles_fetched', 0)
-                overall_stats['total_saved'] += stats.get('articles_saved', 0)
-                overall_stats['total_references'] += stats.get('references_fetched', 0)
-                overall_stats['total_fulltext'] += stats.get('fulltext_fetched', 0)
-                overall_stats['completed_keywords'] += 1
-                
-                # 记录已完成的关键词
-                completed_keywords.add(keyword)
-                
-                # 保存进度
-                self._save_progress({
-                    'completed': list(completed_keywords),
-                    'total_articles': overall_stats['total_articles'],
-                    'total_saved': overall_stats['total_saved'],
-                    'total_references': overall_stats['total_references'],
-                    'total_fulltext': overall_stats['total_fulltext'],
-                    'keyword_stats': overall_stats['keyword_stats'],
-                    'errors': overall_stats['errors']
-                })
-                
-                # 生成关键词报告
-                await self._generate_keyword_report(keyword, stats)
-                
+                async with sem:
+                    # 单条延迟格式化的日志：级别被屏蔽时零开销
+                    self.logger.info(
+                        "\n%s\n正在爬取关键词 %d/%d: %s\n%s",
+                        SEP, index, total_pending, keyword, SEP
+                    )
+
+                    # 构建搜索查询（预特化的查询函数）
+                    search_query = query_fn(keyword)
+
+                    # 重爬时先用轻量 count 探测结果集是否变化，
+                    # 未变化则直接复用上次统计，跳过整个抓取流程
+                    stats = await self._reuse_if_unchanged(
+                        keyword, search_query, previous_stats
+                    )
+
+                    if stats is None:
+                        # 执行爬取（限流 + 指数退避重试）。
+                        # 入库默认不在单个关键词内做，解析结果交还后跨关键词攒批；
+                        # 但引用阶段要求引用方文献先入库（按 PMID 在 articles
+                        # 表解析 DOI），开启引用抓取时退回关键词内立即保存，
+                        # 不走跨关键词缓冲
+                        stats = await self._crawl_with_retry(
+                            keyword=search_query,
+                            max_results=max_results_per_keyword,
+                            save_to_db=save_to_db and fetch_references,
+                            fetch_references=fetch_references,
+                            fetch_fulltext=fetch_fulltext
+                        )
+
+                    articles = stats.pop('articles', None)
+                    flush_saved = 0
+                    if save_to_db and articles:
+                        # 只记"已交给批量写入"的篇数；真实保存数要等缓冲
+                        # 刷库才知道（重复/缺 DOI 的会被丢弃），由刷库
+                        # 返回值计入 total_saved，不预先按提交数虚报
+                        stats['articles_buffered'] = len(articles)
+                        flush_saved = await self._buffer_articles(articles)
+
+                # 更新共享统计并落盘进度，需要持锁
+                async with self._stats_lock:
+                    overall_stats['total_articles'] += stats.get('articles_fetched', 0)
+                    overall_stats['total_saved'] += (
+                        stats.get('articles_saved', 0) + flush_saved
+                    )
+                    overall_stats['total_references'] += stats.get('references_fetched', 0)
+                    overall_stats['total_fulltext'] += stats.get('fulltext_fetched', 0)
+                    overall_stats['completed_keywords'] += 1
+
+                    # 记录已完成的关键词（进度库单行写入）
+                    completed_keywords.add(keyword)
+                    self._record_keyword(keyword, stats)
+
+                # 汇总 CSV 行和关键词报告交给后台写入任务，
+                # 爬取协程不在事件循环里做磁盘 I/O
+                await write_queue.put(('csv', [
+                    keyword,
+                    stats.get('total_found', 0),
+                    stats.get('articles_fetched', 0),
+                    stats.get('articles_saved', 0),
+                    stats.get('references_fetched', 0),
+                    stats.get('fulltext_fetched', 0),
+                    f"{stats.get('duration', 0):.2f}",
+                    '是' if stats.get('errors') else '否'
+                ]))
+                await write_queue.put(('report', (keyword, stats)))
+
             except Exception as e:
-                error_msg = f"爬取关键词 '{keyword}' 失败: {str(e)}"
-                self.logger.error(error_msg, exc_info=True)
-                overall_stats['errors'].append({
-                    'keyword': keyword,
-                    'error': str(e),
-                    'timestamp': datetime.now().isoformat()
-                })
+                if isinstance(e, (httpx.HTTPError, asyncio.TimeoutError)):
+                    # 网络类异常是预期内的：warning 级别，不为它格式化整条回溯
+                    self.logger.warning("爬取关键词 %s 失败: %s", keyword, e)
+                else:
+                    self.logger.error(
+                        "爬取关键词 %s 失败: %s", keyword, e, exc_info=True
+                    )
+                # 人类可读时间戳只取一次，内存和进度库共用
+                now_iso = datetime.now().isoformat()
+                async with self._stats_lock:
+                    overall_stats['errors'].append({
+                        'keyword': keyword,
+                        'error': str(e),
+                        'timestamp': now_iso
+                    })
+                    self._record_error(keyword, str(e), now_iso)
+
+        # 单写者任务统一消费磁盘写入（生产者/消费者模式）
+        write_queue: asyncio.Queue = asyncio.Queue(maxsize=100)
+        writer = asyncio.create_task(self._writer_task(write_queue, csv_writer, csv_f))
+
+        try:
+            await asyncio.gather(
+                *(_crawl_one(i, keyword) for i, keyword in enumerate(pending_keywords, 1)),
+                return_exceptions=True
+            )
+            # 把不足一批的尾巴也写进数据库，真实保存数计入总数
+            overall_stats['total_saved'] += await self._flush_articles()
+            await write_queue.join()
+        finally:
+            await write_queue.put(None)
+            await writer
+            csv_f.close()
+
+        # 最终报告需要的逐关键词统计从进度库读取，而不是全程驻留内存
+        overall_stats['keyword_stats'] = self._load_progress().get('keyword_stats', {})
         
         # 计算总耗时
         overall_stats['end_time'] = datetime.now().isoformat()
-        overall_stats['duration'] = (datetime.now() - start_time).total_seconds()
+        overall_stats['duration'] = time.monotonic() - start_monotonic
         
         # 保存最终统计
         self._save_stats(overall_stats)
@@ -175,10 +359,103 @@ class KeywordCrawler:
         
         return overall_stats
     
+    async def _reuse_if_unchanged(
+        self,
+        keyword: str,
+        search_query: str,
+        previous_stats: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        重爬前检测结果集是否变化，未变化则复用上次统计
+
+        PubMed E-utilities 不支持 ETag/304 条件请求，用 retmax=0 的
+        count 查询做语义层面的重验证：命中总数和上次一致时，
+        认为结果集未变化，跳过整个抓取流程。
+
+        Args:
+            keyword: 原始关键词（进度键）
+            search_query: 实际搜索查询
+            previous_stats: 上次运行的逐关键词统计
+
+        Returns:
+            可复用的统计字典；需要重新爬取时返回 None
+        """
+        prev = previous_stats.get(keyword)
+        if not prev or not prev.get('total_found'):
+            return None
+
+        try:
+            await self.rate_limiter.acquire()
+            async with self.crawler.search_fetcher as fetcher:
+                current_count = await fetcher.count(search_query)
+        except Exception as e:
+            self.logger.warning(f"关键词 '{keyword}' 结果数探测失败，按需重爬: {e}")
+            return None
+
+        if current_count != prev.get('total_found'):
+            return None
+
+        self.logger.info(
+            f"关键词 '{keyword}' 结果数未变化({current_count})，复用上次结果"
+        )
+        return prev
+
+    async def _buffer_articles(self, articles: List[Dict[str, Any]]) -> int:
+        """
+        把单个关键词的解析结果放入批量写缓冲
+
+        攒满 _DB_BATCH_SIZE 篇后统一入库，单次会话单次提交，
+        而不是每个关键词各自开会话、各自提交。
+
+        Returns:
+            本次触发刷库时的真实保存数；未触发刷库为 0
+        """
+        async with self._buffer_lock:
+            self._article_buffer.extend(articles)
+            if len(self._article_buffer) < self._DB_BATCH_SIZE:
+                return 0
+            batch, self._article_buffer = self._article_buffer, []
+
+        saved = await self.crawler._save_articles(batch)
+        self.logger.info("批量入库完成: 提交 %d 篇，保存 %d 篇", len(batch), saved)
+        return saved
+
+    async def _flush_articles(self) -> int:
+        """把缓冲中剩余的不足一批的文献写入数据库，返回真实保存数"""
+        async with self._buffer_lock:
+            batch, self._article_buffer = self._article_buffer, []
+        if not batch:
+            return 0
+        saved = await self.crawler._save_articles(batch)
+        self.logger.info("批量入库收尾: 提交 %d 篇，保存 %d 篇", len(batch), saved)
+        return saved
+
+    @retry_with_backoff(max_retries=3)
+    async def _crawl_with_retry(self, **kwargs) -> Dict[str, Any]:
+        """
+        限流并带指数退避重试地执行单个关键词爬取
+
+        临时性失败（限频、网络抖动）重试后往往能成功，
+        不必直接把关键词标记为失败。
+        """
+        await self.rate_limiter.acquire()
+        return await self.crawler.crawl_by_keyword(**kwargs)
+
     def _build_search_query(self, keyword: str, filters: Optional[Dict[str, Any]]) -> str:
         """构建搜索查询字符串"""
-        query_parts = [keyword]
-        
+        suffix = self._build_filter_suffix(filters)
+        return f"{keyword} AND {suffix}" if suffix else keyword
+
+    @staticmethod
+    def _build_filter_suffix(filters: Optional[Dict[str, Any]]) -> str:
+        """
+        把过滤条件构建成查询后缀
+
+        过滤条件在一次批量爬取中不变，后缀只需构建一次，
+        热路径上每个关键词只做一次字符串拼接。
+        """
+        query_parts = []
+
         if filters:
             # 日期过滤
             if 'date_from' in filters and 'date_to' in filters:
@@ -238,8 +515,43 @@ class KeywordCrawler:
         
         return ' AND '.join(query_parts)
     
-    async def _generate_keyword_report(self, keyword: str, stats: Dict[str, Any]):
-        """生成单个关键词的报告"""
+    async def _writer_task(
+        self,
+        write_queue: asyncio.Queue,
+        csv_writer,
+        csv_f
+    ):
+        """
+        后台写入任务（单消费者）
+
+        统一消费爬取协程投递的 CSV 行和关键词报告，
+        磁盘 I/O 在线程中执行，不阻塞事件循环；
+        收到 None 哨兵后退出。
+        """
+        while True:
+            item = await write_queue.get()
+            if item is None:
+                break
+            kind, payload = item
+            try:
+                if kind == 'csv':
+                    await asyncio.to_thread(self._write_csv_row, csv_writer, csv_f, payload)
+                elif kind == 'report':
+                    keyword, stats = payload
+                    await asyncio.to_thread(self._write_keyword_report, keyword, stats)
+            except Exception as e:
+                self.logger.warning(f"后台写入失败: {e}")
+            finally:
+                write_queue.task_done()
+
+    @staticmethod
+    def _write_csv_row(csv_writer, csv_f, row: List[Any]):
+        """写入并刷新一行汇总 CSV（在线程中执行）"""
+        csv_writer.writerow(row)
+        csv_f.flush()
+
+    def _write_keyword_report(self, keyword: str, stats: Dict[str, Any]):
+        """生成单个关键词的报告（在线程中执行）"""
         report_file = self.output_dir / f"report_{self._sanitize_filename(keyword)}.json"
         
         report = {
@@ -258,44 +570,23 @@ class KeywordCrawler:
             }
         }
         
-        with open(report_file, 'w', encoding='utf-8') as f:
-            json.dump(report, f, ensure_ascii=False, indent=2)
-        
+        _dump_json_file(report, report_file)
+
         self.logger.info(f"关键词报告已保存: {report_file}")
     
     async def _generate_final_report(self, overall_stats: Dict[str, Any]):
         """生成最终汇总报告"""
         # JSON 报告
         report_file = self.output_dir / "final_report.json"
-        with open(report_file, 'w', encoding='utf-8') as f:
-            json.dump(overall_stats, f, ensure_ascii=False, indent=2)
-        
-        # CSV 报告
-        csv_file = self.output_dir / "summary.csv"
-        with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                '关键词', '找到文献数', '获取文献数', '保存文献数', 
-                '引用关系数', '全文数', '耗时(秒)', '错误'
-            ])
-            
-            for keyword, stats in overall_stats['keyword_stats'].items():
-                writer.writerow([
-                    keyword,
-                    stats.get('total_found', 0),
-                    stats.get('articles_fetched', 0),
-                    stats.get('articles_saved', 0),
-                    stats.get('references_fetched', 0),
-                    stats.get('fulltext_fetched', 0),
-                    f"{stats.get('duration', 0):.2f}",
-                    '是' if stats.get('errors') else '否'
-                ])
+        _dump_json_file(overall_stats, report_file)
         
+        # CSV 报告（summary.csv）在爬取过程中逐行流式写入，这里不再重建
+
         # 文本摘要
         summary_file = self.output_dir / "summary.txt"
         with open(summary_file, 'w', encoding='utf-8') as f:
             f.write("PubMed 关键词爬取汇总报告\n")
-            f.write("=" * 50 + "\n\n")
+            f.write(SEP + "\n\n")
             f.write(f"开始时间: {overall_stats['start_time']}\n")
             f.write(f"结束时间: {overall_stats.get('end_time', 'N/A')}\n")
             f.write(f"总耗时: {overall_stats.get('duration', 0):.2f} 秒\n\n")
@@ -309,18 +600,150 @@ class KeywordCrawler:
         
         self.logger.info(f"最终报告已生成: {self.output_dir}")
     
-    def _load_progress(self) -> Dict[str, Any]:
-        """加载进度"""
-        if self.progress_file.exists():
+    def _init_progress_db(self) -> sqlite3.Connection:
+        """初始化 SQLite 进度库（WAL 模式，单行写入代替全量重写）"""
+        conn = sqlite3.connect(self.progress_db_file, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS keywords ("
+            "name TEXT PRIMARY KEY, "
+            "status TEXT NOT NULL DEFAULT 'done', "
+            "stats TEXT, "
+            "updated_at TEXT)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS errors ("
+            "keyword TEXT, error TEXT, ts TEXT)"
+        )
+        conn.commit()
+        self._migrate_legacy_progress(conn)
+        return conn
+
+    def _migrate_legacy_progress(self, conn: sqlite3.Connection):
+        """把旧版 progress.json 一次性导入 SQLite，导入后重命名备份"""
+        if not self.progress_file.exists():
+            return
+        if conn.execute("SELECT COUNT(*) FROM keywords").fetchone()[0]:
+            return
+
+        try:
             with open(self.progress_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {}
-    
-    def _save_progress(self, progress: Dict[str, Any]):
-        """保存进度"""
-        with open(self.progress_file, 'w', encoding='utf-8') as f:
-            json.dump(progress, f, ensure_ascii=False, indent=2)
-    
+                legacy = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        now_iso = datetime.now().isoformat()
+        stats_map = legacy.get('keyword_stats', {})
+        conn.executemany(
+            "INSERT OR REPLACE INTO keywords VALUES (?, ?, ?, ?)",
+            [
+                (kw, 'done', _json_dumps(stats_map.get(kw, {})), now_iso)
+                for kw in legacy.get('completed', [])
+            ]
+        )
+        conn.executemany(
+            "INSERT INTO errors VALUES (?, ?, ?)",
+            [
+                (e.get('keyword', ''), e.get('error', ''), e.get('timestamp', ''))
+                for e in legacy.get('errors', [])
+            ]
+        )
+        conn.commit()
+        self.progress_file.rename(self.progress_file.with_suffix('.json.bak'))
+        self.logger.info("旧版 progress.json 已迁移到 progress.db")
+
+    def _load_progress(self) -> Dict[str, Any]:
+        """从进度库加载进度，聚合出与旧 JSON 相同的结构"""
+        completed = []
+        keyword_stats = {}
+        for name, stats_json in self._progress_conn.execute(
+            "SELECT name, stats FROM keywords WHERE status = 'done'"
+        ):
+            completed.append(name)
+            try:
+                keyword_stats[name] = json.loads(stats_json) if stats_json else {}
+            except ValueError:
+                keyword_stats[name] = {}
+
+        errors = self._load_errors()
+
+        if not completed and not errors:
+            return {}
+
+        progress = {
+            'completed': completed,
+            'keyword_stats': keyword_stats,
+            'errors': errors,
+            'total_articles': 0,
+            'total_saved': 0,
+            'total_references': 0,
+            'total_fulltext': 0,
+        }
+        for stats in keyword_stats.values():
+            progress['total_articles'] += stats.get('articles_fetched', 0)
+            progress['total_saved'] += stats.get('articles_saved', 0)
+            progress['total_references'] += stats.get('references_fetched', 0)
+            progress['total_fulltext'] += stats.get('fulltext_fetched', 0)
+        return progress
+
+    def _load_completed(self) -> frozenset:
+        """只加载已完成关键词集合，不反序列化逐关键词的 stats JSON"""
+        return frozenset(
+            name for (name,) in self._progress_conn.execute(
+                "SELECT name FROM keywords WHERE status = 'done'"
+            )
+        )
+
+    def _load_totals(self) -> Dict[str, int]:
+        """用 SQL 聚合计算累计总数，统计 JSON 留在库里解析"""
+        row = self._progress_conn.execute(
+            "SELECT "
+            "COALESCE(SUM(json_extract(stats, '$.articles_fetched')), 0), "
+            "COALESCE(SUM(json_extract(stats, '$.articles_saved')), 0), "
+            "COALESCE(SUM(json_extract(stats, '$.references_fetched')), 0), "
+            "COALESCE(SUM(json_extract(stats, '$.fulltext_fetched')), 0) "
+            "FROM keywords WHERE status = 'done'"
+        ).fetchone()
+        return {
+            'total_articles': row[0],
+            'total_saved': row[1],
+            'total_references': row[2],
+            'total_fulltext': row[3],
+        }
+
+    def _load_errors(self) -> List[Dict[str, Any]]:
+        """加载历史失败记录"""
+        return [
+            {'keyword': kw, 'error': err, 'timestamp': ts}
+            for kw, err, ts in self._progress_conn.execute(
+                "SELECT keyword, error, ts FROM errors"
+            )
+        ]
+
+    def _record_keyword(self, keyword: str, stats: Dict[str, Any]):
+        """记录单个关键词完成，O(1) 单行写入"""
+        self._progress_conn.execute(
+            "INSERT OR REPLACE INTO keywords VALUES (?, 'done', ?, ?)",
+            (keyword, _json_dumps(stats), datetime.now().isoformat())
+        )
+        self._progress_conn.commit()
+
+    def _record_error(self, keyword: str, error: str, ts: Optional[str] = None):
+        """记录单个关键词的失败信息"""
+        self._progress_conn.execute(
+            "INSERT INTO errors VALUES (?, ?, ?)",
+            (keyword, error, ts or datetime.now().isoformat())
+        )
+        self._progress_conn.commit()
+
+    def _clear_progress(self):
+        """清空进度（--force 模式）"""
+        self._progress_conn.execute("DELETE FROM keywords")
+        self._progress_conn.execute("DELETE FROM errors")
+        self._progress_conn.commit()
+
+
     def _load_stats(self) -> Dict[str, Any]:
         """加载统计"""
         if self.stats_file.exists():
@@ -330,19 +753,30 @@ class KeywordCrawler:
     
     def _save_stats(self, stats: Dict[str, Any]):
         """保存统计"""
-        with open(self.stats_file, 'w', encoding='utf-8') as f:
-            json.dump(stats, f, ensure_ascii=False, indent=2)
+        _dump_json_file(stats, self.stats_file)
     
     @staticmethod
     def _sanitize_filename(filename: str) -> str:
         """清理文件名中的非法字符"""
-        import re
-        # 替换非法字符
-        filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
+        # 替换非法字符（正则在模块加载时已编译）
+        filename = _FILENAME_RE.sub('_', filename)
         # 限制长度
-        if len(filename) > 100:
-            filename = filename[:100]
-        return filename
+        return filename[:100]
+
+
+async def _iter_keywords(args) -> AsyncIterator[str]:
+    """
+    逐个产出待爬关键词
+
+    先产出命令行参数里的关键词，再按行流式读取关键词文件，
+    大文件不会被整体载入内存。
+    """
+    for keyword in args.keywords or []:
+        yield keyword
+    if args.file:
+        async with aiofiles.open(args.file, 'r', encoding='utf-8') as f:
+            async for line in f:
+                yield line
 
 
 async def main():
@@ -369,6 +803,11 @@ async def main():
         type=int,
         help='每个关键词的最大结果数'
     )
+    parser.add_argument(
+        '-c', '--concurrency',
+        type=int,
+        help=f'同时爬取的关键词数（默认: {settings.CRAWLER_MAX_CONCURRENCY}）'
+    )
     
     # 搜索过滤器
     parser.add_argument(
@@ -431,17 +870,25 @@ async def main():
         action='store_true',
         help='强制重新爬取（忽略已完成的关键词）'
     )
+    parser.add_argument(
+        '--normalize-case',
+        action='store_true',
+        help='关键词统一转小写后去重（"COVID-19" 和 "covid-19" 视为同一个）'
+    )
     
     args = parser.parse_args()
     
-    # 获取关键词列表
-    keywords = args.keywords or []
-    
-    if args.file:
-        with open(args.file, 'r', encoding='utf-8') as f:
-            file_keywords = [line.strip() for line in f if line.strip()]
-            keywords.extend(file_keywords)
-    
+    # 流式读入 + 规范化 + 保序去重：文件逐行消费，
+    # 内存里只保留去重后的关键词，不缓存原始行列表
+    seen: Dict[str, None] = {}
+    async for keyword in _iter_keywords(args):
+        keyword = keyword.strip()
+        if args.normalize_case:
+            keyword = keyword.lower()
+        if keyword:
+            seen.setdefault(keyword, None)
+    keywords = list(seen)
+
     if not keywords:
         parser.error('请提供关键词或关键词文件')
     
@@ -463,25 +910,26 @@ async def main():
         filters['mesh_terms'] = args.mesh_terms
     
     # 创建爬虫实例
-    crawler = KeywordCrawler(output_dir=args.output)
+    crawler = KeywordCrawler(output_dir=args.output, concurrency=args.concurrency)
     
     # 执行爬取
     try:
-        stats = await crawler.crawl_keywords(
-            keywords=keywords,
-            filters=filters if filters else None,
-            max_results_per_keyword=args.max_results,
-            save_to_db=not args.no_save,
-            fetch_references=args.fetch_references,
-            fetch_fulltext=args.fetch_fulltext,
-            resume=not args.no_resume,
-            force=args.force  # 传递强制重新爬取参数
-        )
+        async with crawler:
+            stats = await crawler.crawl_keywords(
+                keywords=keywords,
+                filters=filters if filters else None,
+                max_results_per_keyword=args.max_results,
+                save_to_db=not args.no_save,
+                fetch_references=args.fetch_references,
+                fetch_fulltext=args.fetch_fulltext,
+                resume=not args.no_resume,
+                force=args.force  # 传递强制重新爬取参数
+            )
         
         # 打印汇总
-        print("\n" + "="*50)
+        print("\n" + SEP)
         print("爬取完成！")
-        print("="*50)
+        print(SEP)
         print(f"关键词总数: {stats['total_keywords']}")
         print(f"完成关键词数: {stats['completed_keywords']}")
         print(f"文献总数: {stats['total_articles']}")
@@ -1,5 +1,6 @@
 import asyncio
 import time
+from contextlib import asynccontextmanager
 from functools import wraps
 from typing import Any, Callable, Optional, TypeVar, Union
 import httpx
@@ -187,16 +188,46 @@ class EntrezClient:
         result = Entrez.read(handle)
         handle.close()
         return result
-    
+
+    def fetch_iter(self, id_list: Union[str, list], rettype: str = "abstract", retmode: str = "xml"):
+        """
+        流式获取文献详情，逐条产出记录
+
+        与 fetch 不同，不会把整个 XML 结果树一次性物化成字典，
+        调用方消费完一条记录后即可释放，适合大批量爬取。
+
+        Args:
+            id_list: PMID 或 PMID 列表
+            rettype: 返回类型
+            retmode: 返回模式
+
+        Yields:
+            单条文献记录字典
+        """
+        if isinstance(id_list, list):
+            id_list = ','.join(map(str, id_list))
+
+        handle = Entrez.efetch(
+            db="pubmed",
+            id=id_list,
+            rettype=rettype,
+            retmode=retmode
+        )
+        try:
+            for record in Entrez.parse(handle):
+                yield record
+        finally:
+            handle.close()
+
     @retry_with_backoff(max_retries=3)
-    def elink(self, id: str, linkname: str = "pubmed_pubmed_refs") -> dict:
+    def elink(self, id: Union[str, list], linkname: str = "pubmed_pubmed_refs") -> dict:
         """
         获取文献链接（如引用关系）
-        
+
         Args:
-            id: PMID
+            id: PMID 或 PMID 列表（列表时每个 ID 返回独立的 LinkSet）
             linkname: 链接类型
-        
+
         Returns:
             链接结果字典
         """
@@ -220,9 +251,16 @@ class HTTPClient:
         Args:
             timeout: 超时时间（秒）
         """
+        # 所有请求基本都打向 PMC/NCBI 同一主机，放大保活连接池
+        # 让整个爬取过程复用少数几个长连接，省掉每次请求的 TLS 握手
         self.client = httpx.AsyncClient(
+            http2=True,
             timeout=httpx.Timeout(timeout),
-            limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=50,
+                keepalive_expiry=60.0
+            ),
             headers={
                 'User-Agent': 'PubMedCrawler/1.0 (Python/httpx)'
             }
@@ -242,7 +280,26 @@ class HTTPClient:
         """
         await self.rate_limiter.acquire()
         return await self.client.get(url, **kwargs)
-    
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs):
+        """
+        发送流式请求
+
+        响应体按块消费而不是一次性读入内存，适合下载大文件。
+
+        Args:
+            method: HTTP 方法
+            url: 请求 URL
+            **kwargs: 其他参数
+
+        Yields:
+            流式响应对象
+        """
+        await self.rate_limiter.acquire()
+        async with self.client.stream(method, url, **kwargs) as response:
+            yield response
+
     async def close(self):
         """关闭客户端"""
         await self.client.aclose()
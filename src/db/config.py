@@ -1,3 +1,5 @@
+import logging
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import QueuePool
@@ -16,6 +18,24 @@ engine = create_engine(
     future=True
 )
 
+# 开发期 N+1 查询守护：NPLUSONE_ENABLE=1 时给 SQLAlchemy 挂上
+# nplusone 监听器，每次惰性加载关系都会记录 WARNING 日志，
+# 用于及早发现批量处理路径里退化回逐条查询的改动。
+# 生产环境不设该变量，此段完全不生效
+if settings.NPLUSONE_ENABLE:
+    try:
+        from nplusone.core import notifiers, profiler
+        import nplusone.ext.sqlalchemy  # noqa: F401  导入即注册事件监听
+        _nplusone_profiler = profiler.Profiler(notifiers.LogNotifier(
+            logging.getLogger('nplusone'), logging.WARNING
+        ))
+        # 进程级常开，随进程退出结束
+        _nplusone_profiler.__enter__()
+    except ImportError:
+        logging.getLogger(__name__).warning(
+            "NPLUSONE_ENABLE 已设置但未安装 nplusone，检测未启用"
+        )
+
 # 创建会话工厂
 SessionLocal = sessionmaker(
     bind=engine,
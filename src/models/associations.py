@@ -101,6 +101,13 @@ class ArticleAuthorAffiliation(Base):
     author: Mapped["Author"] = relationship("Author", back_populates="author_affiliations")
     affiliation: Mapped["Affiliation"] = relationship("Affiliation", back_populates="author_affiliations")
 
+    __table_args__ = (
+        UniqueConstraint(
+            'article_doi', 'author_id', 'affiliation_id',
+            name='uq_article_author_affiliation'
+        ),
+    )
+
 
 class ArticleReference(Base):
     """文献引用关系表模型"""